@@ -103,6 +103,7 @@
 # python-dotenv==1.0.0
 # tabulate==0.9.0
 # colorama==0.4.6
+# numpy>=1.24
 # 
 
 # ### 2. config.py
@@ -118,6 +119,14 @@ class Config:
     DEFAULT_INSTANCE_TYPE = os.getenv('DEFAULT_INSTANCE_TYPE', 't2.micro')
     DEFAULT_AMI = os.getenv('DEFAULT_AMI', 'ami-0c55b159cbfafe1f0')
     REPORTS_DIR = 'reports'
+    S3_PART_SIZE_MB = int(os.getenv('S3_PART_SIZE_MB', '64'))
+    S3_MAX_CONCURRENCY = int(os.getenv('S3_MAX_CONCURRENCY', '10'))
+    CACHE_DIR = os.getenv('CACHE_DIR', '.cache')
+    EC2_BATCH_SIZE = int(os.getenv('EC2_BATCH_SIZE', '100'))
+    EC2_POLL_SECONDS = int(os.getenv('EC2_POLL_SECONDS', '5'))
+    COST_DB_PATH = os.getenv('COST_DB_PATH', os.path.join(CACHE_DIR, 'costs.sqlite'))
+    # Cost Explorer keeps revising the last few days, so always re-fetch them
+    COST_RESTATE_DAYS = int(os.getenv('COST_RESTATE_DAYS', '3'))
 # 
 
 ### 3. utils.py
@@ -128,21 +137,21 @@ from colorama import init, Fore, Style
 
 init(autoreset=True)
 
-def print_success(message):
-    """Print success message in green"""
-    print(f"{Fore.GREEN}✓ {message}{Style.RESET_ALL}")
+def print_success(message, file=None):
+    """Print success message in green (to stdout unless file is given)"""
+    print(f"{Fore.GREEN}✓ {message}{Style.RESET_ALL}", file=file)
 
-def print_error(message):
-    """Print error message in red"""
-    print(f"{Fore.RED}✗ {message}{Style.RESET_ALL}")
+def print_error(message, file=None):
+    """Print error message in red (to stdout unless file is given)"""
+    print(f"{Fore.RED}✗ {message}{Style.RESET_ALL}", file=file)
 
-def print_info(message):
-    """Print info message in blue"""
-    print(f"{Fore.BLUE}ℹ {message}{Style.RESET_ALL}")
+def print_info(message, file=None):
+    """Print info message in blue (to stdout unless file is given)"""
+    print(f"{Fore.BLUE}ℹ {message}{Style.RESET_ALL}", file=file)
 
-def print_warning(message):
-    """Print warning message in yellow"""
-    print(f"{Fore.YELLOW}⚠ {message}{Style.RESET_ALL}")
+def print_warning(message, file=None):
+    """Print warning message in yellow (to stdout unless file is given)"""
+    print(f"{Fore.YELLOW}⚠ {message}{Style.RESET_ALL}", file=file)
 
 def create_reports_dir():
     """Create reports directory if it doesn't exist"""
@@ -163,6 +172,8 @@ def format_size(bytes):
 
 ### 4. ec2_manager.py
 
+import re
+import time
 import boto3
 from botocore.exceptions import ClientError
 from tabulate import tabulate
@@ -170,6 +181,20 @@ from config import Config
 from utils import print_success, print_error, print_info, print_warning
 
 class EC2Manager:
+    # action -> (target state, states an instance must be in for the action);
+    # one instance in any other state makes EC2 reject its whole batch
+    ACTIONS = {
+        'start': ('running', ('stopped',)),
+        'stop': ('stopped', ('pending', 'running')),
+        'terminate': ('terminated', ('pending', 'running', 'shutting-down', 'stopping', 'stopped')),
+    }
+    # target state -> states from which it can no longer be reached
+    DEAD_ENDS = {
+        'running': {'terminated', 'shutting-down', 'stopping', 'stopped'},
+        'stopped': {'terminated', 'shutting-down'},
+        'terminated': set(),
+    }
+
     def __init__(self):
         self.ec2_client = boto3.client('ec2', region_name=Config.AWS_REGION)
         self.ec2_resource = boto3.resource('ec2', region_name=Config.AWS_REGION)
@@ -177,25 +202,22 @@ class EC2Manager:
     def list_instances(self):
         """List all EC2 instances with their details"""
         try:
-            response = self.ec2_client.describe_instances()
             instances = []
             
-            for reservation in response['Reservations']:
-                for instance in reservation['Instances']:
-                    name = 'N/A'
-                    if 'Tags' in instance:
-                        for tag in instance['Tags']:
-                            if tag['Key'] == 'Name':
-                                name = tag['Value']
-                    
-                    instances.append([
-                        instance['InstanceId'],
-                        name,
-                        instance['InstanceType'],
-                        instance['State']['Name'],
-                        instance.get('PublicIpAddress', 'N/A'),
-                        instance.get('PrivateIpAddress', 'N/A')
-                    ])
+            for page in self.ec2_client.get_paginator('describe_instances').paginate():
+                for reservation in page['Reservations']:
+                    for instance in reservation['Instances']:
+                        tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+                        name = tags.get('Name', 'N/A')
+                        
+                        instances.append([
+                            instance['InstanceId'],
+                            name,
+                            instance['InstanceType'],
+                            instance['State']['Name'],
+                            instance.get('PublicIpAddress', 'N/A'),
+                            instance.get('PrivateIpAddress', 'N/A')
+                        ])
             
             if instances:
                 headers = ['Instance ID', 'Name', 'Type', 'State', 'Public IP', 'Private IP']
@@ -210,35 +232,148 @@ class EC2Manager:
             print_error(f"Error listing instances: {e}")
             return []
     
-    def start_instance(self, instance_id):
-        """Start an EC2 instance"""
+    def resolve_instances(self, instance_ids=None, tags=None, states=None):
+        """Return instance IDs from an explicit list and/or tag filters like {'team': 'payments'}
+
+        With states, only instances currently in one of those states are kept.
+        """
+        if instance_ids and not tags and not states:
+            return list(dict.fromkeys(instance_ids))
+        if instance_ids and not tags:
+            found = self._describe_states(dict.fromkeys(instance_ids))
+            unknown = [i for i, state in found.items() if state == 'not-found']
+            if unknown:
+                print_warning(f"Unknown instance IDs: {', '.join(unknown)}")
+            return [i for i in dict.fromkeys(instance_ids) if found.get(i) in states]
+        filters = [{'Name': f'tag:{key}', 'Values': [value]} for key, value in (tags or {}).items()]
+        if states:
+            filters.append({'Name': 'instance-state-name', 'Values': list(states)})
+        params = {'Filters': filters}
+        if instance_ids:
+            params['InstanceIds'] = list(instance_ids)
+        found = []
+        for page in self.ec2_client.get_paginator('describe_instances').paginate(**params):
+            for reservation in page['Reservations']:
+                found.extend(instance['InstanceId'] for instance in reservation['Instances'])
+        return found
+
+    def _chunks(self, items, size=None):
+        size = size or Config.EC2_BATCH_SIZE
+        for i in range(0, len(items), size):
+            yield items[i:i + size]
+
+    def _describe_states(self, instance_ids):
+        """Return {instance_id: state}; IDs EC2 no longer knows map to 'not-found'"""
+        states = {}
+        chunk = list(instance_ids)
+        while chunk:
+            try:
+                for page in self.ec2_client.get_paginator('describe_instances').paginate(InstanceIds=chunk):
+                    for reservation in page['Reservations']:
+                        for instance in reservation['Instances']:
+                            states[instance['InstanceId']] = instance['State']['Name']
+                return states
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'InvalidInstanceID.NotFound':
+                    raise
+                # the error names the unknown IDs; drop them and ask again for the rest
+                missing = set(re.findall(r'i-[0-9a-f]+', e.response['Error'].get('Message', ''))) & set(chunk)
+                if not missing:
+                    raise
+                states.update((instance_id, 'not-found') for instance_id in missing)
+                chunk = [instance_id for instance_id in chunk if instance_id not in missing]
+        return states
+
+    def wait_for_state(self, instance_ids, target_state, timeout=1800, poll_seconds=None):
+        """Poll all instances with one describe_instances call per 1000 IDs per tick.
+
+        Returns {instance_id: last_seen_state}. Instances that reach a state
+        from which target_state is unreachable (e.g. terminated or stopped
+        again while waiting for running), or that no longer exist
+        ('not-found'), stop being polled. A 'stopped' seen on the very first
+        poll after a start is treated as not yet updated, not as a failure.
+        """
+        poll_seconds = poll_seconds or Config.EC2_POLL_SECONDS
+        dead_ends = self.DEAD_ENDS[target_state] | {'not-found'}
+        states = {instance_id: None for instance_id in instance_ids}
+        pending = set(instance_ids)
+        deadline = time.time() + timeout
+        first_poll = True
+        while pending:
+            for chunk in self._chunks(sorted(pending), 1000):
+                for instance_id, state in self._describe_states(chunk).items():
+                    states[instance_id] = state
+                    if first_poll and target_state == 'running' and state == 'stopped':
+                        continue
+                    if state == target_state or state in dead_ends:
+                        pending.discard(instance_id)
+            first_poll = False
+            done = len(instance_ids) - len(pending)
+            print_info(f"{done}/{len(instance_ids)} instances settled (target: {target_state})")
+            if not pending:
+                break
+            if time.time() >= deadline:
+                print_warning(f"Timed out waiting for {len(pending)} instances")
+                break
+            time.sleep(poll_seconds)
+        return states
+
+    def _bulk_action(self, action, instance_ids=None, tags=None, wait=True):
+        target_state, valid_states = self.ACTIONS[action]
+        requested = instance_ids
         try:
-            self.ec2_client.start_instances(InstanceIds=[instance_id])
-            print_success(f"Starting instance: {instance_id}")
-            
-            # Wait for instance to be running
-            waiter = self.ec2_client.get_waiter('instance_running')
-            print_info("Waiting for instance to start...")
-            waiter.wait(InstanceIds=[instance_id])
-            print_success(f"Instance {instance_id} is now running")
-            
+            instance_ids = self.resolve_instances(instance_ids, tags, states=valid_states)
         except ClientError as e:
-            print_error(f"Error starting instance: {e}")
+            print_error(f"Error resolving instances for {action}: {e}")
+            return {}
+        if requested and len(instance_ids) < len(set(requested)):
+            print_info(f"Skipping {len(set(requested)) - len(instance_ids)} instance(s) "
+                       f"not in a state that allows {action}")
+        if not instance_ids:
+            print_warning("No matching instances")
+            return {}
+        call = getattr(self.ec2_client, f"{action}_instances")
+        accepted = []
+        for chunk in self._chunks(instance_ids):
+            try:
+                call(InstanceIds=chunk)
+                accepted.extend(chunk)
+            except ClientError as e:
+                print_error(f"Error during {action} of {len(chunk)} instances: {e}")
+        if not accepted:
+            return {}
+        print_success(f"{action.capitalize()} requested for {len(accepted)} instances")
+        if not wait:
+            return {instance_id: None for instance_id in accepted}
+
+        states = self.wait_for_state(accepted, target_state)
+        failed = {i: s for i, s in states.items() if s != target_state}
+        if failed:
+            for instance_id, state in failed.items():
+                print_warning(f"{instance_id} is {state}, expected {target_state}")
+        else:
+            print_success(f"All {len(accepted)} instances are now {target_state}")
+        return states
+
+    def start_instances(self, instance_ids=None, tags=None, wait=True):
+        """Start many instances selected by ID and/or tags"""
+        return self._bulk_action('start', instance_ids, tags, wait)
+
+    def stop_instances(self, instance_ids=None, tags=None, wait=True):
+        """Stop many instances selected by ID and/or tags"""
+        return self._bulk_action('stop', instance_ids, tags, wait)
+
+    def terminate_instances(self, instance_ids=None, tags=None, wait=True):
+        """Terminate many instances selected by ID and/or tags"""
+        return self._bulk_action('terminate', instance_ids, tags, wait)
+
+    def start_instance(self, instance_id):
+        """Start an EC2 instance"""
+        return self.start_instances([instance_id])
     
     def stop_instance(self, instance_id):
         """Stop an EC2 instance"""
-        try:
-            self.ec2_client.stop_instances(InstanceIds=[instance_id])
-            print_success(f"Stopping instance: {instance_id}")
-            
-            # Wait for instance to be stopped
-            waiter = self.ec2_client.get_waiter('instance_stopped')
-            print_info("Waiting for instance to stop...")
-            waiter.wait(InstanceIds=[instance_id])
-            print_success(f"Instance {instance_id} is now stopped")
-            
-        except ClientError as e:
-            print_error(f"Error stopping instance: {e}")
+        return self.stop_instances([instance_id])
     
     def create_instance(self, instance_name, instance_type=None, ami_id=None):
         """Create a new EC2 instance"""
@@ -274,17 +409,7 @@ class EC2Manager:
     
     def terminate_instance(self, instance_id):
         """Terminate an EC2 instance"""
-        try:
-            response = self.ec2_client.terminate_instances(InstanceIds=[instance_id])
-            print_warning(f"Terminating instance: {instance_id}")
-            
-            waiter = self.ec2_client.get_waiter('instance_terminated')
-            print_info("Waiting for instance to terminate...")
-            waiter.wait(InstanceIds=[instance_id])
-            print_success(f"Instance {instance_id} terminated")
-            
-        except ClientError as e:
-            print_error(f"Error terminating instance: {e}")
+        return self.terminate_instances([instance_id])
     
     def get_instance_status(self, instance_id):
         """Get detailed status of an instance"""
@@ -308,45 +433,124 @@ class EC2Manager:
 
 
 ### 5. s3_manager.py
+import csv
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import boto3
-from botocore.exceptions import ClientError
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
 from tabulate import tabulate
 from config import Config
 from utils import print_success, print_error, print_info, print_warning, format_size
 
+class TransferProgress:
+    """Progress callback for boto3 transfers that reports throughput"""
+
+    def __init__(self, label, total, interval=2.0):
+        self.label = label
+        self.total = total
+        self.seen = 0
+        self.started = time.time()
+        self.interval = interval
+        self.last_report = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, bytes_amount):
+        # boto3 calls this from its worker threads
+        with self.lock:
+            self.seen += bytes_amount
+            now = time.time()
+            if now - self.last_report < self.interval and self.seen < self.total:
+                return
+            self.last_report = now
+            percent = (self.seen / self.total * 100) if self.total else 100
+            print_info(f"{self.label}: {format_size(self.seen)} / {format_size(self.total)} "
+                       f"({percent:.1f}%) at {format_size(self.throughput())}/s")
+
+    def throughput(self):
+        elapsed = time.time() - self.started
+        return self.seen / elapsed if elapsed > 0 else 0
+
+
 class S3Manager:
     def __init__(self):
         self.s3_client = boto3.client('s3', region_name=Config.AWS_REGION)
         self.s3_resource = boto3.resource('s3', region_name=Config.AWS_REGION)
+        part_size = Config.S3_PART_SIZE_MB * 1024 * 1024
+        self.transfer_config = TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=Config.S3_MAX_CONCURRENCY
+        )
     
-    def list_buckets(self):
+    def _load_region_cache(self):
+        path = os.path.join(Config.CACHE_DIR, 'bucket_regions.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return {}
+
+    def _save_region_cache(self, cache):
+        os.makedirs(Config.CACHE_DIR, exist_ok=True)
+        path = os.path.join(Config.CACHE_DIR, 'bucket_regions.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(cache, f)
+        os.replace(path + '.tmp', path)
+
+    def _get_bucket_region(self, bucket_name):
+        location = self.s3_client.get_bucket_location(Bucket=bucket_name)
+        return location['LocationConstraint'] or 'us-east-1'
+
+    def list_buckets(self, workers=16):
         """List all S3 buckets"""
         try:
             response = self.s3_client.list_buckets()
+            # A bucket's region is fixed for its lifetime, so cache it keyed by
+            # name and creation date (a re-created bucket gets a new entry)
+            cache = self._load_region_cache()
+            keys = {
+                bucket['Name']: f"{bucket['Name']}@{bucket['CreationDate'].isoformat()}"
+                for bucket in response['Buckets']
+            }
+            missing = [name for name, key in keys.items() if key not in cache]
+
+            failures = {}
+            if missing:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {name: pool.submit(self._get_bucket_region, name) for name in missing}
+                    for name, future in futures.items():
+                        try:
+                            cache[keys[name]] = future.result()
+                        except ClientError as e:
+                            failures[name] = e.response['Error']['Code']
+                        except BotoCoreError as e:
+                            failures[name] = type(e).__name__
+                live = set(keys.values())
+                self._save_region_cache({k: v for k, v in cache.items() if k in live})
+
             buckets = []
-            
             for bucket in response['Buckets']:
-                # Get bucket region
-                try:
-                    location = self.s3_client.get_bucket_location(
-                        Bucket=bucket['Name']
-                    )
-                    region = location['LocationConstraint'] or 'us-east-1'
-                except:
-                    region = 'N/A'
-                
                 buckets.append([
                     bucket['Name'],
                     bucket['CreationDate'].strftime('%Y-%m-%d %H:%M:%S'),
-                    region
+                    cache.get(keys[bucket['Name']], 'N/A')
                 ])
             
             if buckets:
                 headers = ['Bucket Name', 'Created', 'Region']
                 print(tabulate(buckets, headers=headers, tablefmt='grid'))
-                print_info(f"Total buckets: {len(buckets)}")
+                print_info(f"Total buckets: {len(buckets)} "
+                           f"({len(missing)} region lookups, {len(buckets) - len(missing)} cached)")
             else:
                 print_warning("No S3 buckets found")
+            for name, code in failures.items():
+                print_warning(f"Could not get region for {name}: {code}")
             
             return buckets
             
@@ -372,12 +576,77 @@ class S3Manager:
             print_error(f"Error creating bucket: {e}")
             return False
     
-    def delete_bucket(self, bucket_name):
+    def _iter_version_batches(self, bucket_name, batch_size=1000):
+        """Yield lists of (key, version_id, size) covering every version and delete marker"""
+        paginator = self.s3_client.get_paginator('list_object_versions')
+        batch = []
+        for page in paginator.paginate(Bucket=bucket_name):
+            for version in page.get('Versions', []):
+                batch.append((version['Key'], version['VersionId'], version.get('Size', 0)))
+            for marker in page.get('DeleteMarkers', []):
+                batch.append((marker['Key'], marker['VersionId'], 0))
+            while len(batch) >= batch_size:
+                yield batch[:batch_size]
+                batch = batch[batch_size:]
+        if batch:
+            yield batch
+
+    def _delete_batch(self, bucket_name, batch):
+        response = self.s3_client.delete_objects(
+            Bucket=bucket_name,
+            Delete={
+                'Objects': [{'Key': key, 'VersionId': version_id} for key, version_id, _ in batch],
+                'Quiet': True
+            }
+        )
+        return len(batch), response.get('Errors', [])
+
+    def purge_bucket(self, bucket_name, dry_run=False, workers=8):
+        """Delete every object version and delete marker in a bucket.
+
+        With dry_run, only count what would be deleted.
+        """
+        totals = {'objects': 0, 'bytes': 0, 'deleted': 0, 'errors': 0}
+        started = time.time()
+        if dry_run:
+            for batch in self._iter_version_batches(bucket_name):
+                totals['objects'] += len(batch)
+                totals['bytes'] += sum(size for _, _, size in batch)
+            print_info(f"{bucket_name}: {totals['objects']} object versions, {format_size(totals['bytes'])}")
+            return totals
+
+        def report(future):
+            count, errors = future.result()
+            totals['deleted'] += count - len(errors)
+            totals['errors'] += len(errors)
+            for error in errors[:5]:
+                print_error(f"Could not delete {error['Key']} ({error.get('VersionId')}): {error['Code']}")
+            if len(errors) > 5:
+                print_error(f"... and {len(errors) - 5} more errors in this batch")
+            elapsed = time.time() - started
+            print_info(f"Deleted {totals['deleted']} objects ({totals['deleted'] / elapsed:.0f}/s)")
+
+        # bound the number of queued batches so listing never runs far ahead
+        in_flight = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for batch in self._iter_version_batches(bucket_name):
+                totals['objects'] += len(batch)
+                totals['bytes'] += sum(size for _, _, size in batch)
+                in_flight.append(pool.submit(self._delete_batch, bucket_name, batch))
+                if len(in_flight) >= workers * 2:
+                    report(in_flight.pop(0))
+            for future in in_flight:
+                report(future)
+        return totals
+
+    def delete_bucket(self, bucket_name, workers=8):
         """Delete an S3 bucket"""
         try:
-            # First, delete all objects in the bucket
-            bucket = self.s3_resource.Bucket(bucket_name)
-            bucket.objects.all().delete()
+            # First, delete all object versions and delete markers in the bucket
+            totals = self.purge_bucket(bucket_name, workers=workers)
+            if totals['errors']:
+                print_error(f"{totals['errors']} objects could not be deleted; keeping bucket {bucket_name}")
+                return False
             
             # Then delete the bucket
             self.s3_client.delete_bucket(Bucket=bucket_name)
@@ -394,51 +663,285 @@ class S3Manager:
             if object_name is None:
                 object_name = file_path.split('/')[-1]
             
-            self.s3_client.upload_file(file_path, bucket_name, object_name)
-            print_success(f"Uploaded {file_path} to {bucket_name}/{object_name}")
+            progress = TransferProgress(object_name, os.path.getsize(file_path))
+            self.s3_client.upload_file(
+                file_path, bucket_name, object_name,
+                Config=self.transfer_config,
+                Callback=progress
+            )
+            print_success(f"Uploaded {file_path} to {bucket_name}/{object_name} "
+                          f"({format_size(progress.throughput())}/s)")
             return True
             
         except ClientError as e:
             print_error(f"Error uploading file: {e}")
             return False
     
-    def download_file(self, bucket_name, object_name, file_path):
-        """Download a file from S3 bucket"""
+    def _download_range(self, bucket_name, object_name, etag, file_path, fd, start, end, progress):
+        """Fetch bytes [start, end] and write them at their offset in the file"""
+        response = self.s3_client.get_object(
+            Bucket=bucket_name, Key=object_name,
+            Range=f"bytes={start}-{end}", IfMatch=etag
+        )
+        offset = start
+        if hasattr(os, 'pwrite'):
+            for chunk in response['Body'].iter_chunks(1024 * 1024):
+                os.pwrite(fd, chunk, offset)
+                offset += len(chunk)
+                progress(len(chunk))
+        else:
+            # Windows has no pwrite; a private handle per range keeps seek+write thread-safe
+            with open(file_path, 'r+b') as f:
+                f.seek(start)
+                for chunk in response['Body'].iter_chunks(1024 * 1024):
+                    f.write(chunk)
+                    offset += len(chunk)
+                    progress(len(chunk))
+        if offset != end + 1:
+            raise IOError(f"Short read for bytes {start}-{end}: got {offset - start} bytes")
+
+    def _verify_etag(self, bucket_name, object_name, file_path, etag, size, encryption=None):
+        """Compare the local file against the object's ETag.
+
+        Single-part ETags are the MD5 of the object; multipart ETags are the
+        MD5 of the concatenated part MD5s followed by "-<parts>". SSE-KMS
+        objects have opaque ETags, so they cannot be checked and None is
+        returned instead of True/False.
+        """
+        if encryption == 'aws:kms':
+            return None
+        etag = etag.strip('"')
+        if '-' in etag:
+            part_count = int(etag.split('-')[1])
+            head = self.s3_client.head_object(Bucket=bucket_name, Key=object_name, PartNumber=1)
+            part_size = head['ContentLength']
+        else:
+            part_count, part_size = 1, size
+
+        digests = []
+        with open(file_path, 'rb') as f:
+            for i in range(part_count):
+                part = hashlib.md5()
+                remaining = min(part_size, size - i * part_size)
+                while remaining > 0:
+                    chunk = f.read(min(remaining, 8 * 1024 * 1024))
+                    if not chunk:
+                        return False
+                    part.update(chunk)
+                    remaining -= len(chunk)
+                digests.append(part)
+
+        if '-' in etag:
+            actual = hashlib.md5(b''.join(d.digest() for d in digests)).hexdigest() + f"-{part_count}"
+        else:
+            actual = digests[0].hexdigest()
+        return actual == etag
+
+    def download_file(self, bucket_name, object_name, file_path, workers=None, chunk_size=None):
+        """Download a file from S3 bucket using parallel ranged GETs.
+
+        Completed ranges are recorded in <file_path>.parts.json so an
+        interrupted download only re-fetches the missing ranges.
+        """
+        workers = workers or Config.S3_MAX_CONCURRENCY
+        chunk_size = chunk_size or Config.S3_PART_SIZE_MB * 1024 * 1024
+        state_path = file_path + '.parts.json'
         try:
-            self.s3_client.download_file(bucket_name, object_name, file_path)
-            print_success(f"Downloaded {bucket_name}/{object_name} to {file_path}")
+            head = self.s3_client.head_object(Bucket=bucket_name, Key=object_name)
+            size = head['ContentLength']
+            etag = head['ETag']
+            ranges = [(start, min(start + chunk_size, size) - 1) for start in range(0, size, chunk_size)]
+
+            done = set()
+            state = self._load_download_state(state_path) if os.path.exists(file_path) else None
+            if state and state.get('etag') == etag and state.get('chunk_size') == chunk_size:
+                done = set(state['done'])
+                print_info(f"Resuming download: {len(done)}/{len(ranges)} ranges already present")
+            state = {'etag': etag, 'chunk_size': chunk_size, 'done': sorted(done)}
+
+            mode = os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+            fd = os.open(file_path, mode, 0o644)
+            try:
+                # preallocate so every range can be written straight to its offset
+                os.ftruncate(fd, size)
+                todo = [i for i in range(len(ranges)) if i not in done]
+                already = sum(ranges[i][1] - ranges[i][0] + 1 for i in done)
+                progress = TransferProgress(object_name, size - already)
+                lock = threading.Lock()
+
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {
+                        pool.submit(self._download_range, bucket_name, object_name, etag, file_path, fd, *ranges[i], progress): i
+                        for i in todo
+                    }
+                    # checkpoint ranges as they finish, not in submission order
+                    for future in as_completed(futures):
+                        i = futures[future]
+                        future.result()
+                        with lock:
+                            state['done'].append(i)
+                            self._save_download_state(state_path, state)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+            verified = self._verify_etag(bucket_name, object_name, file_path, etag, size,
+                                         head.get('ServerSideEncryption'))
+            if verified is None:
+                print_warning(f"{object_name} is SSE-KMS encrypted; its ETag is not an MD5, skipping checksum")
+            elif not verified:
+                print_warning(f"Checksum mismatch for {object_name} (expected ETag {etag})")
+                if os.path.exists(state_path):
+                    os.remove(state_path)
+                return False
+            if os.path.exists(state_path):
+                os.remove(state_path)
+            print_success(f"Downloaded {bucket_name}/{object_name} to {file_path} "
+                          f"({format_size(progress.throughput())}/s)")
             return True
             
-        except ClientError as e:
+        except (ClientError, BotoCoreError, OSError, ValueError) as e:
             print_error(f"Error downloading file: {e}")
             return False
+
+    def _load_download_state(self, state_path):
+        """Read a .parts.json checkpoint; a missing or unreadable one means no resume"""
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print_warning(f"Ignoring unreadable download checkpoint {state_path}: {e}")
+            return None
+        if not isinstance(state, dict) or not isinstance(state.get('done'), list):
+            print_warning(f"Ignoring malformed download checkpoint {state_path}")
+            return None
+        return state
+
+    def _save_download_state(self, state_path, state):
+        # write-then-rename, so a crash mid-write never leaves a truncated checkpoint
+        with open(state_path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(state_path + '.tmp', state_path)
     
-    def list_objects(self, bucket_name):
-        """List all objects in a bucket"""
+    def iter_objects(self, bucket_name, prefix='', delimiter=None):
+        """Yield every object under prefix, following continuation tokens.
+
+        With a delimiter, common prefixes are yielded as {'Prefix': ...} dicts.
+        """
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        params = {'Bucket': bucket_name, 'Prefix': prefix}
+        if delimiter:
+            params['Delimiter'] = delimiter
+        for page in paginator.paginate(**params):
+            yield from page.get('Contents', [])
+            yield from page.get('CommonPrefixes', [])
+
+    def _iter_objects_sharded(self, bucket_name, prefix, workers):
+        """List each top-level "directory" under prefix on its own thread"""
+        shards = []
+        for item in self.iter_objects(bucket_name, prefix, delimiter='/'):
+            if 'Prefix' in item:
+                shards.append(item['Prefix'])
+            else:
+                yield item
+
+        results = queue.Queue(maxsize=64)
+        done = object()
+        # set when the consumer stops early (closed generator, broken pipe,
+        # writer error) so workers never block forever on a full queue
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def list_shard(shard):
+            try:
+                batch = []
+                for obj in self.iter_objects(bucket_name, shard):
+                    batch.append(obj)
+                    if len(batch) >= 1000:
+                        if not put(batch):
+                            return
+                        batch = []
+                put(batch)
+            except ClientError as e:
+                print_error(f"Error listing {shard}: {e}")
+            finally:
+                put(done)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(list_shard, shard) for shard in shards]
+            try:
+                remaining = len(shards)
+                while remaining:
+                    batch = results.get()
+                    if batch is done:
+                        remaining -= 1
+                    else:
+                        yield from batch
+            finally:
+                stop.set()
+                for future in futures:
+                    future.cancel()
+                while True:
+                    try:
+                        results.get_nowait()
+                    except queue.Empty:
+                        break
+
+    def list_objects(self, bucket_name, prefix='', output_format='ndjson', output_file=None, parallel=False, workers=8):
+        """Stream all objects in a bucket as NDJSON or CSV with running totals"""
+        out = open(output_file, 'w', newline='') if output_file else sys.stdout
+        # keep stdout pure NDJSON/CSV when the listing itself goes there
+        status = None if output_file else sys.stderr
+        totals = {'count': 0, 'size': 0}
         try:
-            response = self.s3_client.list_objects_v2(Bucket=bucket_name)
-            
-            if 'Contents' not in response:
-                print_warning(f"No objects found in bucket: {bucket_name}")
-                return []
-            
-            objects = []
-            for obj in response['Contents']:
-                objects.append([
-                    obj['Key'],
-                    format_size(obj['Size']),
-                    obj['LastModified'].strftime('%Y-%m-%d %H:%M:%S')
-                ])
-            
-            headers = ['Object Key', 'Size', 'Last Modified']
-            print(tabulate(objects, headers=headers, tablefmt='grid'))
-            print_info(f"Total objects: {len(objects)}")
-            
-            return objects
-            
+            if parallel:
+                objects = self._iter_objects_sharded(bucket_name, prefix, workers)
+            else:
+                objects = self.iter_objects(bucket_name, prefix)
+
+            writer = None
+            if output_format == 'csv':
+                writer = csv.writer(out)
+                writer.writerow(['Key', 'Size', 'LastModified', 'StorageClass'])
+
+            for obj in objects:
+                row = {
+                    'Key': obj['Key'],
+                    'Size': obj['Size'],
+                    'LastModified': obj['LastModified'].strftime('%Y-%m-%d %H:%M:%S'),
+                    'StorageClass': obj.get('StorageClass', 'STANDARD')
+                }
+                if writer:
+                    writer.writerow(row.values())
+                else:
+                    out.write(json.dumps(row) + '\n')
+                totals['count'] += 1
+                totals['size'] += obj['Size']
+                if output_file and totals['count'] % 100000 == 0:
+                    print_info(f"{totals['count']} objects, {format_size(totals['size'])} so far...")
+
+            if totals['count']:
+                print_info(f"Total objects: {totals['count']} ({format_size(totals['size'])})", file=status)
+            else:
+                print_warning(f"No objects found in bucket: {bucket_name}", file=status)
+            return totals
+
         except ClientError as e:
-            print_error(f"Error listing objects: {e}")
-            return []
+            print_error(f"Error listing objects: {e}", file=status)
+            return totals
+        finally:
+            if output_file:
+                out.close()
     
     def delete_object(self, bucket_name, object_name):
         """Delete an object from S3 bucket"""
@@ -453,83 +956,451 @@ class S3Manager:
 
 
 ### 6. cost_analyzer.py
+import csv
+import json
+import os
+import sqlite3
+import time
 import boto3
+import numpy as np
 from datetime import datetime, timedelta
 from botocore.exceptions import ClientError
 from tabulate import tabulate
 from config import Config
-from utils import print_success, print_error, print_info, create_reports_dir, get_timestamp
+from utils import print_success, print_error, print_info, print_warning, create_reports_dir, get_timestamp
+
+class CostStore:
+    """Local SQLite copy of daily Cost Explorer data, keyed by (date, service)"""
+
+    def __init__(self, path=None):
+        path = path or Config.COST_DB_PATH
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS daily_cost (
+                date TEXT NOT NULL,
+                service TEXT NOT NULL,
+                amount REAL NOT NULL,
+                unit TEXT,
+                PRIMARY KEY (date, service)
+            );
+            CREATE TABLE IF NOT EXISTS synced_day (
+                date TEXT PRIMARY KEY,
+                fetched_at TEXT NOT NULL
+            );
+        ''')
+
+    def synced_dates(self, start, end):
+        rows = self.conn.execute(
+            'SELECT date FROM synced_day WHERE date >= ? AND date < ?', (start, end)
+        )
+        return {row[0] for row in rows}
+
+    def replace_days(self, results):
+        """Store ResultsByTime entries, replacing whatever was kept for those days"""
+        fetched_at = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            for result in results:
+                day = result['TimePeriod']['Start']
+                self.conn.execute('DELETE FROM daily_cost WHERE date = ?', (day,))
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO daily_cost (date, service, amount, unit) VALUES (?, ?, ?, ?)',
+                    [
+                        (day, group['Keys'][0],
+                         float(group['Metrics']['UnblendedCost']['Amount']),
+                         group['Metrics']['UnblendedCost'].get('Unit'))
+                        for group in result.get('Groups', [])
+                    ]
+                )
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO synced_day (date, fetched_at) VALUES (?, ?)', (day, fetched_at)
+                )
+
+
+class CostFrame:
+    """Columnar cost rows: int-coded dimensions, day offsets and a float amount array.
+
+    Dimensions (service, linked account, region, usage type, tag, ...) are
+    dictionary-encoded once, so grouping is a bincount over combined codes
+    instead of a dict update per row.
+    """
+
+    def __init__(self, start_date, day, amount, codes, labels):
+        self.start_date = start_date
+        self.day = day
+        self.amount = amount
+        self.codes = codes
+        self.labels = labels
+        self.num_days = int(day.max()) + 1 if len(day) else 0
+
+    @classmethod
+    def from_rows(cls, rows, dims):
+        """Build from an iterable of (date_str, {dim: value}, amount) tuples"""
+        lookups = {dim: {} for dim in dims}
+        dates, amounts = [], []
+        codes = {dim: [] for dim in dims}
+        for date, values, amount in rows:
+            dates.append(date)
+            amounts.append(amount)
+            for dim in dims:
+                lookup = lookups[dim]
+                codes[dim].append(lookup.setdefault(values.get(dim, ''), len(lookup)))
+        # ISO dates sort correctly as strings, so the day index is just their order
+        unique_dates = sorted(set(dates))
+        start_date = datetime.strptime(unique_dates[0], '%Y-%m-%d').date() if unique_dates else None
+        date_index = {
+            d: (datetime.strptime(d, '%Y-%m-%d').date() - start_date).days for d in unique_dates
+        }
+        return cls(
+            start_date,
+            np.fromiter((date_index[d] for d in dates), dtype=np.int32, count=len(dates)),
+            np.asarray(amounts, dtype=np.float64),
+            {dim: np.asarray(codes[dim], dtype=np.int32) for dim in dims},
+            {dim: list(lookups[dim]) for dim in dims}
+        )
+
+    @classmethod
+    def from_ce_results(cls, results, dims):
+        """Build from Cost Explorer ResultsByTime grouped by the given dims"""
+        def rows():
+            for result in results:
+                date = result['TimePeriod']['Start']
+                for group in result.get('Groups', []):
+                    # tag keys come back as "key$value"
+                    values = dict(zip(dims, (k.split('$', 1)[-1] for k in group['Keys'])))
+                    yield date, values, float(group['Metrics']['UnblendedCost']['Amount'])
+        return cls.from_rows(rows(), dims)
+
+    @classmethod
+    def from_store(cls, store, start, end):
+        rows = store.conn.execute(
+            'SELECT date, service, amount FROM daily_cost WHERE date >= ? AND date < ?', (start, end)
+        )
+        return cls.from_rows(((d, {'SERVICE': svc}, amt) for d, svc, amt in rows), ['SERVICE'])
+
+    def _group_codes(self, dims):
+        shape = tuple(len(self.labels[dim]) for dim in dims)
+        combined = np.ravel_multi_index([self.codes[dim] for dim in dims], shape) if dims else np.zeros(len(self.amount), dtype=np.int64)
+        present, group = np.unique(combined, return_inverse=True)
+        keys = [
+            tuple(self.labels[dim][i] for dim, i in zip(dims, idx))
+            for idx in zip(*np.unravel_index(present, shape))
+        ] if dims else [()]
+        return keys, group
+
+    def group_by(self, dims):
+        """Return (keys, totals) with totals[i] the summed amount of keys[i]"""
+        keys, group = self._group_codes(dims)
+        return keys, np.bincount(group, weights=self.amount, minlength=len(keys))
+
+    def daily(self, dims):
+        """Return (keys, matrix) where matrix[group, day] is that day's cost"""
+        keys, group = self._group_codes(dims)
+        flat = np.bincount(group * self.num_days + self.day, weights=self.amount,
+                           minlength=len(keys) * self.num_days)
+        return keys, flat.reshape(len(keys), self.num_days)
+
+    @staticmethod
+    def rolling_mean(matrix, window):
+        """Trailing mean over `window` days for every group at once"""
+        csum = np.cumsum(matrix, axis=1)
+        out = csum.copy()
+        out[:, window:] = csum[:, window:] - csum[:, :-window]
+        counts = np.minimum(np.arange(1, matrix.shape[1] + 1), window)
+        return out / counts
+
+    @staticmethod
+    def day_over_day(matrix):
+        deltas = np.zeros_like(matrix)
+        deltas[:, 1:] = np.diff(matrix, axis=1)
+        return deltas
+
+    def summary(self, dims, window=7):
+        """Per-group total, last-day cost, day-over-day change and rolling mean.
+
+        Works on masked bincounts rather than the dense group x day matrix,
+        so memory stays proportional to the row count.
+        """
+        if not self.num_days:
+            return []
+        keys, group = self._group_codes(dims)
+        size = len(keys)
+        last = self.num_days - 1
+
+        def sum_where(mask):
+            return np.bincount(group[mask], weights=self.amount[mask], minlength=size)
+
+        totals = np.bincount(group, weights=self.amount, minlength=size)
+        last_day = sum_where(self.day == last)
+        prev_day = sum_where(self.day == last - 1) if last else np.zeros(size)
+        rolling = sum_where(self.day > last - window) / min(window, self.num_days)
+        order = np.argsort(-totals, kind='stable')
+        return [
+            dict(zip(dims, keys[i]), total=float(totals[i]), last_day=float(last_day[i]),
+                 day_over_day=float(last_day[i] - prev_day[i]), rolling_mean=float(rolling[i]))
+            for i in order
+        ]
+
+    @staticmethod
+    def export(rows, path):
+        """Write summary rows as .csv, .json or a columnar .npz file"""
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+                writer.writeheader()
+                writer.writerows(rows)
+        elif path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump(rows, f, indent=2)
+        elif path.endswith('.npz'):
+            # one array per column, like a single Parquet row group
+            columns = {name: np.asarray([row[name] for row in rows]) for name in (rows[0] if rows else {})}
+            np.savez_compressed(path, **columns)
+        else:
+            raise ValueError(f"Unsupported export format: {path}")
+        return path
+
+
+def benchmark_cost_frame(num_rows=500000, days=90, seed=0):
+    """Time building and aggregating a synthetic multi-dimension cost table"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1).date()
+    dims = ['SERVICE', 'LINKED_ACCOUNT', 'REGION', 'USAGE_TYPE', 'TAG']
+    cardinality = {'SERVICE': 60, 'LINKED_ACCOUNT': 40, 'REGION': 20, 'USAGE_TYPE': 400, 'TAG': 25}
+    picks = {dim: rng.integers(0, n, num_rows) for dim, n in cardinality.items()}
+    day_pick = rng.integers(0, days, num_rows)
+    amounts = rng.gamma(2.0, 3.0, num_rows)
+    date_strs = [(start + timedelta(days=int(d))).isoformat() for d in range(days)]
+    rows = [
+        (date_strs[day_pick[i]], {dim: f"{dim}-{picks[dim][i]}" for dim in dims}, amounts[i])
+        for i in range(num_rows)
+    ]
+
+    timings = {}
+    started = time.perf_counter()
+    frame = CostFrame.from_rows(rows, dims)
+    timings['build_s'] = time.perf_counter() - started
+    for group in (['SERVICE'], ['SERVICE', 'REGION'], ['LINKED_ACCOUNT', 'USAGE_TYPE', 'TAG']):
+        started = time.perf_counter()
+        frame.summary(group)
+        timings['summary_' + '+'.join(group) + '_s'] = time.perf_counter() - started
+
+    # the per-row dict loop generate_cost_report used before
+    started = time.perf_counter()
+    totals = {}
+    for _, values, amount in rows:
+        key = values['SERVICE']
+        totals[key] = totals.get(key, 0) + float(amount)
+    timings['dict_loop_SERVICE_s'] = time.perf_counter() - started
+    return {'rows': num_rows, **{k: round(v, 4) for k, v in timings.items()}}
+
+
+def forecast_daily_costs(matrix, first_weekday, horizon=30, alpha=0.3, beta=0.05, period=7, z_threshold=3.5, offset=0):
+    """Forecast every row of a (series x day) cost matrix in one vectorized pass.
+
+    Each series is split into a weekly seasonal profile plus a Holt
+    (double exponentially weighted) level and trend. Residuals against the
+    one-step-ahead fit give a robust z-score (median/MAD) per series;
+    the latest day is flagged when it exceeds z_threshold. The horizon
+    starts `offset` days after the day following the last column, for
+    histories that stop before today.
+    """
+    num_series, num_days = matrix.shape
+    weekday = (first_weekday + np.arange(num_days)) % period
+
+    # Clip outliers before estimating anything so one spike drags neither the
+    # weekly profile nor the level/trend
+    center = np.median(matrix, axis=1, keepdims=True)
+    deviation = np.abs(matrix - center)
+    spread = 1.4826 * np.median(deviation, axis=1, keepdims=True)
+    # Sparse series (mostly zeros) have MAD 0; fall back to the mean absolute
+    # deviation so a lone spike is still clipped
+    spread = np.where(spread > 0, spread, 1.2533 * deviation.mean(axis=1, keepdims=True))
+    clipped = np.clip(matrix, center - 5 * spread, center + 5 * spread)
+
+    # Additive weekly profile: mean of each weekday minus the series mean
+    seasonal = np.zeros((num_series, period))
+    if num_days >= 2 * period:
+        series_mean = clipped.mean(axis=1, keepdims=True)
+        for d in range(period):
+            seasonal[:, d] = clipped[:, weekday == d].mean(axis=1) - series_mean[:, 0]
+    smoothed_input = clipped - seasonal[:, weekday]
+
+    level = smoothed_input[:, 0].copy()
+    trend = np.zeros(num_series)
+    fitted = np.zeros_like(matrix)
+    fitted[:, 0] = matrix[:, 0]
+    for t in range(1, num_days):
+        fitted[:, t] = level + trend + seasonal[:, weekday[t]]
+        new_level = alpha * smoothed_input[:, t] + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+
+    steps = np.arange(offset + 1, offset + horizon + 1)
+    future_weekday = (first_weekday + num_days - 1 + steps) % period
+    future = level[:, None] + trend[:, None] * steps + seasonal[:, future_weekday]
+    future = np.clip(future, 0, None)
+
+    residuals = matrix[:, 1:] - fitted[:, 1:]
+    median = np.median(residuals, axis=1) if num_days > 1 else np.zeros(num_series)
+    mad = np.median(np.abs(residuals - median[:, None]), axis=1) if num_days > 1 else np.zeros(num_series)
+    # 0.6745 makes MAD comparable to a standard deviation for normal data
+    latest = residuals[:, -1] if num_days > 1 else np.zeros(num_series)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(mad > 0, 0.6745 * (latest - median) / mad, 0.0)
+
+    return {
+        'forecast_total': future.sum(axis=1),
+        'daily_forecast': future,
+        'latest_zscore': z,
+        'anomaly': np.abs(z) > z_threshold,
+        'trend_per_day': trend,
+    }
+
 
 class CostAnalyzer:
-    def __init__(self):
+    def __init__(self, store=None):
         self.ce_client = boto3.client('ce', region_name='us-east-1')  # Cost Explorer is only in us-east-1
+        self.store = store or CostStore()
     
-    def get_cost_and_usage(self, days=30):
-        """Get cost and usage for the past N days"""
+    def get_cost_and_usage(self, days=30, start_date=None, end_date=None, group_by=None):
+        """Get daily cost and usage, following NextPageToken.
+
+        group_by is up to two Cost Explorer GroupBy entries; SERVICE by default.
+        """
         try:
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=days)
+            end_date = end_date or datetime.now().date()
+            start_date = start_date or end_date - timedelta(days=days)
             
-            response = self.ce_client.get_cost_and_usage(
-                TimePeriod={
+            params = {
+                'TimePeriod': {
                     'Start': start_date.strftime('%Y-%m-%d'),
                     'End': end_date.strftime('%Y-%m-%d')
                 },
-                Granularity='DAILY',
-                Metrics=['UnblendedCost'],
-                GroupBy=[
+                'Granularity': 'DAILY',
+                'Metrics': ['UnblendedCost'],
+                'GroupBy': group_by or [
                     {'Type': 'DIMENSION', 'Key': 'SERVICE'}
                 ]
-            )
-            
-            return response['ResultsByTime']
+            }
+            # One day can be split across pages, so merge groups by period
+            results = {}
+            while True:
+                response = self.ce_client.get_cost_and_usage(**params)
+                for result in response['ResultsByTime']:
+                    day = result['TimePeriod']['Start']
+                    if day in results:
+                        results[day]['Groups'].extend(result.get('Groups', []))
+                    else:
+                        results[day] = result
+                token = response.get('NextPageToken')
+                if not token:
+                    break
+                params['NextPageToken'] = token
+            
+            return [results[day] for day in sorted(results)]
             
         except ClientError as e:
             print_error(f"Error getting cost data: {e}")
             print_info("Note: Cost Explorer API requires specific IAM permissions")
             return None
+
+    def sync(self, days=30):
+        """Fetch only the days missing from the local store, plus the restatement window.
+
+        Returns False if Cost Explorer could not be queried.
+        """
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days)
+        restate_from = end_date - timedelta(days=Config.COST_RESTATE_DAYS)
+        have = self.store.synced_dates(start_date.isoformat(), end_date.isoformat())
+
+        wanted = []
+        day = start_date
+        while day < end_date:
+            if day.isoformat() not in have or day >= restate_from:
+                wanted.append(day)
+            day += timedelta(days=1)
+        if not wanted:
+            return True
+
+        # Group missing days into contiguous ranges: one request (plus pages) per range
+        ranges = []
+        for day in wanted:
+            if ranges and ranges[-1][1] == day:
+                ranges[-1][1] = day + timedelta(days=1)
+            else:
+                ranges.append([day, day + timedelta(days=1)])
+
+        for range_start, range_end in ranges:
+            results = self.get_cost_and_usage(start_date=range_start, end_date=range_end)
+            if results is None:
+                return False
+            self.store.replace_days(results)
+        print_info(f"Synced {len(wanted)} days of cost data in {len(ranges)} request(s)")
+        return True
     
-    def generate_cost_report(self, days=30):
+    def get_cost_frame(self, days=30, dimensions=('SERVICE',), tag_key=None):
+        """Load a CostFrame for the last N days.
+
+        Service-only frames come from the local store; other groupings are
+        fetched from Cost Explorer, which allows at most two GroupBy keys
+        (a tag counts as one).
+        """
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days)
+        dims = list(dimensions)
+        if dims == ['SERVICE'] and not tag_key:
+            if not self.sync(days):
+                return None
+            return CostFrame.from_store(self.store, start_date.isoformat(), end_date.isoformat())
+
+        group_by = [{'Type': 'DIMENSION', 'Key': dim} for dim in dims]
+        if tag_key:
+            group_by.append({'Type': 'TAG', 'Key': tag_key})
+            dims.append('TAG')
+        if len(group_by) > 2:
+            raise ValueError("Cost Explorer can group by at most two keys per request")
+        results = self.get_cost_and_usage(start_date=start_date, end_date=end_date, group_by=group_by)
+        if results is None:
+            return None
+        return CostFrame.from_ce_results(results, dims)
+
+    def generate_cost_report(self, days=30, dimensions=('SERVICE',), tag_key=None, export_path=None):
         """Generate a detailed cost report"""
         try:
             create_reports_dir()
             
-            results = self.get_cost_and_usage(days)
-            if not results:
+            frame = self.get_cost_frame(days, dimensions, tag_key)
+            if frame is None:
                 return
-            
-            # Aggregate costs by service
-            service_costs = {}
-            total_cost = 0
-            
-            for result in results:
-                for group in result['Groups']:
-                    service = group['Keys'][0]
-                    cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                    
-                    if service not in service_costs:
-                        service_costs[service] = 0
-                    service_costs[service] += cost
-                    total_cost += cost
-            
-            # Sort by cost
-            sorted_costs = sorted(service_costs.items(), key=lambda x: x[1], reverse=True)
+            dims = list(dimensions) + (['TAG'] if tag_key else [])
+            rows = frame.summary(dims)
+            if not rows:
+                print_info(f"No cost data for the last {days} days")
+                return
+            total_cost = sum(row['total'] for row in rows)
             
             # Create report table
             report_data = []
-            for service, cost in sorted_costs:
-                percentage = (cost / total_cost * 100) if total_cost > 0 else 0
+            for row in rows:
+                percentage = (row['total'] / total_cost * 100) if total_cost > 0 else 0
                 report_data.append([
-                    service,
-                    f"${cost:.2f}",
-                    f"{percentage:.2f}%"
+                    *(row[dim] for dim in dims),
+                    f"${row['total']:.2f}",
+                    f"{percentage:.2f}%",
+                    f"${row['last_day']:.2f}",
+                    f"{row['day_over_day']:+.2f}",
+                    f"${row['rolling_mean']:.2f}"
                 ])
             
             # Print report
             print_info(f"Cost Report - Last {days} days")
             print(f"Total Cost: ${total_cost:.2f}\n")
-            headers = ['Service', 'Cost', 'Percentage']
-            print(tabulate(report_data, headers=headers, tablefmt='grid'))
+            headers = [dim.replace('_', ' ').title() for dim in dims] + \
+                ['Cost', 'Percentage', 'Last Day', 'Day/Day', '7d Avg']
+            print(tabulate(report_data, headers=headers, tablefmt='grid', disable_numparse=True))
             
             # Save report to file
             timestamp = get_timestamp()
@@ -539,13 +1410,65 @@ class CostAnalyzer:
                 f.write(f"AWS Cost Report - Last {days} days\n")
                 f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"Total Cost: ${total_cost:.2f}\n\n")
-                f.write(tabulate(report_data, headers=headers, tablefmt='grid'))
+                f.write(tabulate(report_data, headers=headers, tablefmt='grid', disable_numparse=True))
             
             print_success(f"Report saved to: {filename}")
+            if export_path:
+                print_success(f"Data exported to: {CostFrame.export(rows, export_path)}")
             
         except Exception as e:
             print_error(f"Error generating report: {e}")
     
+    def forecast_local(self, days=30, history_days=90, cross_check=False, refresh=False):
+        """Forecast the next N days per service from the local cost store.
+
+        Runs offline on whatever the store already holds unless refresh is
+        set (see sync); with cross_check the total is compared against
+        get_cost_forecast. The forecast always covers today onwards, even
+        when the store stops short of yesterday.
+        """
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=history_days)
+        if refresh and not self.sync(history_days):
+            print_warning("Could not sync the cost store - forecasting from cached data only")
+        frame = CostFrame.from_store(self.store, start_date.isoformat(), end_date.isoformat())
+        if not frame.num_days:
+            print_warning("No cached cost data yet - generate a cost report first")
+            return None
+
+        last_day = frame.start_date + timedelta(days=frame.num_days - 1)
+        gap = (end_date - last_day).days - 1
+        if gap > 0:
+            print_warning(f"Cost store ends on {last_day} ({gap} day(s) missing); "
+                          f"sync it for a more accurate forecast")
+        keys, matrix = frame.daily(['SERVICE'])
+        result = forecast_daily_costs(matrix, frame.start_date.weekday(), horizon=days, offset=max(0, gap))
+        order = np.argsort(-result['forecast_total'])
+        rows = []
+        for i in order:
+            rows.append([
+                keys[i][0],
+                f"${result['forecast_total'][i]:.2f}",
+                f"{result['trend_per_day'][i]:+.4f}",
+                f"{result['latest_zscore'][i]:+.1f}",
+                'ANOMALY' if result['anomaly'][i] else ''
+            ])
+        total = float(result['forecast_total'].sum())
+
+        print_info(f"Local forecast for next {days} days (from {frame.num_days} days of history)")
+        print(tabulate(rows, headers=['Service', 'Forecast', 'Trend/Day', 'Latest Z', 'Flag'],
+                       tablefmt='grid', disable_numparse=True))
+        print_info(f"Forecasted total: ${total:.2f}")
+        for i in np.flatnonzero(result['anomaly']):
+            print_warning(f"{keys[i][0]}: latest day ${matrix[i, -1]:.2f} is unusual "
+                          f"(z={result['latest_zscore'][i]:+.1f})")
+
+        if cross_check:
+            api_total = self.get_forecast(days)
+            if api_total:
+                print_info(f"Local vs Cost Explorer: {(total - api_total) / api_total * 100:+.1f}%")
+        return total
+
     def get_forecast(self, days=30):
         """Get cost forecast for next N days"""
         try:
@@ -580,6 +1503,18 @@ from s3_manager import S3Manager
 from cost_analyzer import CostAnalyzer
 from utils import print_success, print_error, print_info, print_warning
 
+def parse_targets(text):
+    """Split "i-1, i-2" or "tag:team=payments" input into (instance_ids, tags)"""
+    instance_ids, tags = [], {}
+    for part in text.replace(' ', ',').split(','):
+        part = part.strip()
+        if part.startswith('tag:') and '=' in part:
+            key, value = part[4:].split('=', 1)
+            tags[key] = value
+        elif part:
+            instance_ids.append(part)
+    return instance_ids or None, tags or None
+
 def print_menu():
     """Display the main menu"""
     print("\n" + "="*60)
@@ -587,10 +1522,10 @@ def print_menu():
     print("="*60)
     print("\n[EC2 MANAGEMENT]")
     print("  1. List all EC2 instances")
-    print("  2. Start an EC2 instance")
-    print("  3. Stop an EC2 instance")
+    print("  2. Start EC2 instances")
+    print("  3. Stop EC2 instances")
     print("  4. Create an EC2 instance")
-    print("  5. Terminate an EC2 instance")
+    print("  5. Terminate EC2 instances")
     print("  6. Get instance status")
     
     print("\n[S3 MANAGEMENT]")
@@ -630,12 +1565,12 @@ def main():
                 ec2.list_instances()
             
             elif choice == '2':
-                instance_id = input("Enter instance ID: ").strip()
-                ec2.start_instance(instance_id)
+                targets = input("Enter instance IDs or tag:key=value (comma-separated): ").strip()
+                ec2.start_instances(*parse_targets(targets))
             
             elif choice == '3':
-                instance_id = input("Enter instance ID: ").strip()
-                ec2.stop_instance(instance_id)
+                targets = input("Enter instance IDs or tag:key=value (comma-separated): ").strip()
+                ec2.stop_instances(*parse_targets(targets))
             
             elif choice == '4':
                 name = input("Enter instance name: ").strip()
@@ -643,10 +1578,13 @@ def main():
                 ec2.create_instance(name, instance_type)
             
             elif choice == '5':
-                instance_id = input("Enter instance ID: ").strip()
-                confirm = input(f"Are you sure you want to terminate {instance_id}? (yes/no): ").strip()
-                if confirm.lower() == 'yes':
-                    ec2.terminate_instance(instance_id)
+                targets = input("Enter instance IDs or tag:key=value (comma-separated): ").strip()
+                instance_ids, tags = parse_targets(targets)
+                terminable = EC2Manager.ACTIONS['terminate'][1]
+                matched = ec2.resolve_instances(instance_ids, tags, states=terminable) if instance_ids or tags else []
+                confirm = input(f"Are you sure you want to terminate {len(matched)} instance(s)? (yes/no): ").strip()
+                if matched and confirm.lower() == 'yes':
+                    ec2.terminate_instances(matched)
                 else:
                     print_warning("Termination cancelled")
             
@@ -664,6 +1602,7 @@ def main():
             
             elif choice == '9':
                 bucket_name = input("Enter bucket name: ").strip()
+                s3.purge_bucket(bucket_name, dry_run=True)
                 confirm = input(f"Are you sure you want to delete {bucket_name}? (yes/no): ").strip()
                 if confirm.lower() == 'yes':
                     s3.delete_bucket(bucket_name)
@@ -683,7 +1622,10 @@ def main():
             
             elif choice == '12':
                 bucket_name = input("Enter bucket name: ").strip()
-                s3.list_objects(bucket_name)
+                prefix = input("Enter prefix (optional): ").strip()
+                output_file = input("Save to file (.csv or .ndjson, blank for screen): ").strip() or None
+                output_format = 'csv' if output_file and output_file.endswith('.csv') else 'ndjson'
+                s3.list_objects(bucket_name, prefix, output_format, output_file, parallel=True)
             
             elif choice == '13':
                 bucket_name = input("Enter bucket name: ").strip()
@@ -694,12 +1636,19 @@ def main():
             elif choice == '14':
                 days = input("Enter number of days (default: 30): ").strip()
                 days = int(days) if days else 30
-                cost.generate_cost_report(days)
+                dims = input("Group by (e.g. SERVICE,REGION; default: SERVICE): ").strip()
+                dims = [d.strip().upper() for d in dims.split(',') if d.strip()] or ['SERVICE']
+                tag_key = input("Also group by tag key (optional): ").strip() or None
+                export_path = input("Export to .csv/.json/.npz (optional): ").strip() or None
+                cost.generate_cost_report(days, dims, tag_key, export_path)
             
             elif choice == '15':
                 days = input("Enter number of days to forecast (default: 30): ").strip()
                 days = int(days) if days else 30
-                cost.get_forecast(days)
+                refresh = input("Sync the cost store from Cost Explorer first (billed per request)? (yes/no, default: no): ").strip()
+                cross_check = input("Cross-check with Cost Explorer API? (yes/no): ").strip()
+                cost.forecast_local(days, cross_check=cross_check.lower() == 'yes',
+                                    refresh=refresh.lower() == 'yes')
             
             else:
                 print_error("Invalid choice. Please try again.")
@@ -760,6 +1709,7 @@ __pycache__/
 *.pyc
 .env
 reports/
+.cache/
 *.log
 .aws/
 credentials
@@ -1,13 +1,24 @@
 import argparse
 import datetime
+import gzip
+import hashlib
+import heapq
+import itertools
 import json
 import logging
 import os
+import random
+import re
+import sqlite3
 import sys
+import threading
 import time
-from typing import List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
 import boto3
-from botocore.exceptions import ClientError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 
 #!/usr/bin/env python3
 """
@@ -18,13 +29,24 @@ Requirements:
 
 Usage examples:
     python aws_manager.py list-ec2
+    python aws_manager.py list-ec2 --all-regions --workers 8
+    python aws_manager.py list-ec2 --format ndjson --fields InstanceId,State,Tags
+    python aws_manager.py inventory --state running --type 'm5.*' --tag team=payments
+    python aws_manager.py inventory --refresh --all-regions
     python aws_manager.py start-ec2 --id i-0123456789abcdef0
     python aws_manager.py list-s3
     python aws_manager.py create-s3 --name my-bucket-unique-12345 --region us-east-1
     python aws_manager.py fetch-logs --group /aws/lambda/my-func --start -3600 --limit 50
+    python aws_manager.py fetch-logs --group /aws/lambda/my-func --start -86400 --limit 0 --slices 24 --workers 4
     python aws_manager.py analyze-logs --group /aws/lambda/my-func --start -3600
+    python aws_manager.py export-logs --group /aws/lambda/my-func --start 86400 --out logs.ndjson.gz --checkpoint logs.ckpt
     python aws_manager.py deploy-s3 --bucket my-bucket --key releases/app.zip --file ./app.zip
+    python aws_manager.py sync --dir ./build --bucket my-bucket --prefix site/ --delete
+    python aws_manager.py deploy-s3 --bucket my-bucket --key releases/big.tar --file ./big.tar --part-size 128 --concurrency 16
+    AWS_ENDPOINT_URL=http://localhost:5000 python aws_manager.py bench-upload --bucket bench --file ./big.tar --part-sizes 8,32,128
     python aws_manager.py codedeploy --app MyApp --group MyGroup --bucket my-bucket --key releases/app.zip
+    python aws_manager.py rollout --app MyApp --groups canary,eu-1,eu-2,us-1,us-2 --wave-size 2 --max-failures 0 --bucket my-bucket --key releases/app.zip
+    python aws_manager.py bench-clients --iterations 200
 """
 
 
@@ -33,35 +55,316 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(mess
 logger = logging.getLogger("aws_manager")
 
 
-def get_client(service_name: str, region: Optional[str] = None):
-        if region:
-                return boto3.client(service_name, region_name=region)
-        return boto3.client(service_name)
+# Process-wide client registry. boto3 clients are thread-safe once built, so
+# one per (service, region, profile) is shared by every command and worker.
+CLIENT_CONFIG = Config(
+        max_pool_connections=int(os.getenv("AWS_MANAGER_POOL_SIZE", "32")),
+        tcp_keepalive=True,
+        # botocore's standard policy only; throttling is handled explicitly
+        # (and counted) by the log fetchers and the Comprehend batcher
+        retries={"mode": "standard"},
+)
+_registry_lock = threading.Lock()
+_sessions = {}
+_clients = {}
+
+
+def get_session(profile: Optional[str] = None) -> boto3.Session:
+        profile = profile or os.getenv("AWS_PROFILE") or None
+        with _registry_lock:
+                session = _sessions.get(profile)
+                if session is None:
+                        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+                        _sessions[profile] = session
+                return session
+
+
+def get_client(service_name: str, region: Optional[str] = None, profile: Optional[str] = None):
+        profile = profile or os.getenv("AWS_PROFILE") or None
+        key = (service_name, region, profile)
+        client = _clients.get(key)
+        if client is not None:
+                return client
+        session = get_session(profile)
+        with _registry_lock:
+                client = _clients.get(key)
+                if client is None:
+                        # Session.client is not thread-safe, so build under the lock
+                        client = session.client(service_name, region_name=region, config=CLIENT_CONFIG)
+                        _clients[key] = client
+                return client
+
+
+def clear_clients():
+        with _registry_lock:
+                _clients.clear()
+                _sessions.clear()
+
+
+def benchmark_get_client(service_name: str = "logs", region: str = "us-east-1", iterations: int = 200) -> dict:
+        """Compare per-call cost of a fresh boto3.client against the registry."""
+        started = time.perf_counter()
+        for _ in range(iterations):
+                boto3.client(service_name, region_name=region)
+        uncached = (time.perf_counter() - started) / iterations
+
+        clear_clients()
+        started = time.perf_counter()
+        for _ in range(iterations):
+                get_client(service_name, region)
+        cached = (time.perf_counter() - started) / iterations
+        return {
+                "service": service_name,
+                "iterations": iterations,
+                "uncached_ms_per_call": round(uncached * 1000, 4),
+                "cached_ms_per_call": round(cached * 1000, 4),
+        }
 
 
 # EC2 Management
-def list_ec2_instances(region: Optional[str] = None):
+class InstanceRecord(NamedTuple):
+        """Compact per-instance record; a tuple costs far less than a dict per instance."""
+
+        InstanceId: str
+        State: Optional[str]
+        InstanceType: Optional[str]
+        LaunchTime: Any
+        VpcId: Optional[str]
+        Tags: list
+        Region: Optional[str] = None
+
+        @classmethod
+        def from_api(cls, inst: dict, region: Optional[str] = None) -> "InstanceRecord":
+                return cls(
+                        inst.get("InstanceId"),
+                        inst.get("State", {}).get("Name"),
+                        inst.get("InstanceType"),
+                        inst.get("LaunchTime"),
+                        inst.get("VpcId"),
+                        inst.get("Tags", []),
+                        region,
+                )
+
+        def to_dict(self, fields: Optional[Sequence[str]] = None) -> dict:
+                if fields:
+                        return {f: getattr(self, f) for f in fields}
+                d = self._asdict()
+                d["LaunchTime"] = str(self.LaunchTime)
+                if self.Region is None:
+                        del d["Region"]
+                return d
+
+
+def iter_ec2_instances(region: Optional[str] = None) -> Iterator[InstanceRecord]:
+        """Yield instance records page by page, following NextToken."""
         ec2 = get_client("ec2", region)
-        try:
-                resp = ec2.describe_instances()
-                instances = []
-                for r in resp.get("Reservations", []):
+        paginator = ec2.get_paginator("describe_instances")
+        for page in paginator.paginate():
+                for r in page.get("Reservations", []):
                         for inst in r.get("Instances", []):
-                                instances.append(
-                                        {
-                                                "InstanceId": inst.get("InstanceId"),
-                                                "State": inst.get("State", {}).get("Name"),
-                                                "InstanceType": inst.get("InstanceType"),
-                                                "LaunchTime": str(inst.get("LaunchTime")),
-                                                "Tags": inst.get("Tags", []),
-                                        }
-                                )
-                return instances
+                                yield InstanceRecord.from_api(inst, region)
+
+
+def list_ec2_instances(region: Optional[str] = None):
+        try:
+                return [rec.to_dict() for rec in iter_ec2_instances(region)]
         except ClientError as e:
                 logger.error("Failed to list EC2 instances: %s", e)
                 return []
 
 
+def write_json_stream(records: Iterable[InstanceRecord], out: TextIO, fields: Optional[Sequence[str]] = None, ndjson: bool = False) -> int:
+        """Stream records as a JSON array (always closed) or NDJSON without building a list."""
+        encode = json.JSONEncoder(default=str).encode
+        count = 0
+        if not ndjson:
+                out.write("[")
+        try:
+                for rec in records:
+                        if ndjson:
+                                out.write(encode(rec.to_dict(fields)))
+                                out.write("\n")
+                        else:
+                                out.write(",\n  " if count else "\n  ")
+                                out.write(encode(rec.to_dict(fields)))
+                        count += 1
+        finally:
+                if not ndjson:
+                        out.write("\n]\n" if count else "]\n")
+                out.flush()
+        return count
+
+
+def benchmark_list_ec2(count: int = 50000, page_size: int = 1000) -> dict:
+        """Compare time and traced peak memory of the old list-of-dicts path and streamed records."""
+        import io
+        import tracemalloc
+
+        launch = datetime.datetime(2024, 1, 1)
+
+        def pages():
+                for start in range(0, count, page_size):
+                        yield {
+                                "Reservations": [
+                                        {"Instances": [
+                                                {
+                                                        "InstanceId": "i-%017x" % i,
+                                                        "State": {"Code": 16, "Name": "running"},
+                                                        "InstanceType": "m5.large",
+                                                        "LaunchTime": launch,
+                                                        "VpcId": "vpc-0123456789abcdef0",
+                                                        "PrivateIpAddress": "10.0.%d.%d" % (i // 256 % 256, i % 256),
+                                                        "Tags": [{"Key": "Name", "Value": "web-%d" % i}, {"Key": "team", "Value": "payments"}],
+                                                }
+                                        ]}
+                                        for i in range(start, min(start + page_size, count))
+                                ]
+                        }
+
+        def old_path(sink):
+                instances = []
+                for page in pages():
+                        for r in page["Reservations"]:
+                                for inst in r["Instances"]:
+                                        instances.append({"InstanceId": inst.get("InstanceId"), "State": inst.get("State", {}).get("Name"), "InstanceType": inst.get("InstanceType"), "LaunchTime": str(inst.get("LaunchTime")), "Tags": inst.get("Tags", [])})
+                sink.write(json.dumps(instances, indent=2, default=str))
+
+        def new_path(sink, fields=None):
+                records = (InstanceRecord.from_api(inst) for page in pages() for r in page["Reservations"] for inst in r["Instances"])
+                write_json_stream(records, sink, fields=fields, ndjson=True)
+
+        class NullSink(io.TextIOBase):
+                def write(self, text):
+                        return len(text)
+
+        results = {"instances": count}
+        for name, fn in (("list_dicts_json_dumps", old_path), ("stream_records_ndjson", new_path), ("stream_fields_InstanceId_State", lambda sink: new_path(sink, ["InstanceId", "State"]))):
+                tracemalloc.start()
+                started = time.perf_counter()
+                fn(NullSink())
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results[name] = {"seconds": round(elapsed, 3), "instances_per_second": round(count / elapsed), "peak_mb": round(peak / MB, 2)}
+        try:
+                import resource
+
+                results["process_max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        except ImportError:
+                pass
+        return results
+
+
+def list_ec2_regions(region: Optional[str] = None) -> List[str]:
+        ec2 = get_client("ec2", region)
+        resp = ec2.describe_regions()
+        return sorted(r["RegionName"] for r in resp.get("Regions", []))
+
+
+def _list_region_instances(region: str) -> Tuple[str, List[InstanceRecord], float, Optional[str]]:
+        started = time.perf_counter()
+        try:
+                instances = list(iter_ec2_instances(region))
+                return region, instances, time.perf_counter() - started, None
+        except (ClientError, BotoCoreError) as e:
+                # one unreachable or unauthorised region must not abort the others
+                logger.error("Failed to list EC2 instances in %s: %s", region, e)
+                return region, [], time.perf_counter() - started, str(e)
+
+
+def list_ec2_instances_all_regions(regions: Optional[List[str]] = None, max_workers: int = 8) -> Iterator[Tuple[str, List[InstanceRecord], float, Optional[str]]]:
+        """Yield (region, instances, seconds, error) as each region finishes on a bounded pool."""
+        if regions is None:
+                regions = list_ec2_regions()
+        if not regions:
+                return
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(regions)))) as pool:
+                futures = [pool.submit(_list_region_instances, r) for r in regions]
+                for fut in as_completed(futures):
+                        yield fut.result()
+
+
+DEFAULT_INVENTORY_PATH = os.path.join(os.path.expanduser("~"), ".cache", "aws_manager", "ec2_inventory.sqlite")
+
+
+class Ec2Inventory:
+        """Local SQLite snapshot of EC2 instances per region with indexed tags, state, type and VPC."""
+
+        def __init__(self, path: str = DEFAULT_INVENTORY_PATH):
+                if path != ":memory:":
+                        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self.conn = sqlite3.connect(path)
+                self.conn.executescript(
+                        """
+                        CREATE TABLE IF NOT EXISTS instance (
+                                instance_id TEXT PRIMARY KEY, region TEXT, state TEXT, instance_type TEXT,
+                                vpc_id TEXT, launch_time TEXT, name TEXT, record TEXT);
+                        CREATE TABLE IF NOT EXISTS tag (instance_id TEXT, key TEXT, value TEXT);
+                        CREATE TABLE IF NOT EXISTS snapshot (region TEXT PRIMARY KEY, refreshed_at REAL);
+                        CREATE INDEX IF NOT EXISTS instance_state ON instance(state);
+                        CREATE INDEX IF NOT EXISTS instance_type ON instance(instance_type);
+                        CREATE INDEX IF NOT EXISTS instance_vpc ON instance(vpc_id);
+                        CREATE INDEX IF NOT EXISTS instance_region ON instance(region);
+                        CREATE INDEX IF NOT EXISTS tag_key_value ON tag(key, value, instance_id);
+                        CREATE INDEX IF NOT EXISTS tag_instance ON tag(instance_id);
+                        """
+                )
+
+        def snapshot_ages(self) -> dict:
+                now = time.time()
+                return {region: now - ts for region, ts in self.conn.execute("SELECT region, refreshed_at FROM snapshot")}
+
+        def replace_region(self, region: str, instances: List[InstanceRecord]):
+                with self.conn:
+                        self.conn.execute("DELETE FROM tag WHERE instance_id IN (SELECT instance_id FROM instance WHERE region = ?)", (region,))
+                        self.conn.execute("DELETE FROM instance WHERE region = ?", (region,))
+                        self.conn.executemany(
+                                "INSERT OR REPLACE INTO instance VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                [
+                                        (
+                                                inst.InstanceId, region, inst.State, inst.InstanceType, inst.VpcId, str(inst.LaunchTime),
+                                                next((t["Value"] for t in inst.Tags if t["Key"] == "Name"), None),
+                                                json.dumps(inst.to_dict(), default=str),
+                                        )
+                                        for inst in instances
+                                ],
+                        )
+                        self.conn.executemany(
+                                "INSERT INTO tag VALUES (?, ?, ?)",
+                                [(inst.InstanceId, t["Key"], t["Value"]) for inst in instances for t in inst.Tags],
+                        )
+                        self.conn.execute("INSERT OR REPLACE INTO snapshot VALUES (?, ?)", (region, time.time()))
+
+        def refresh(self, regions: List[str], max_age_seconds: int = 900, force: bool = False, max_workers: int = 8) -> List[str]:
+                ages = self.snapshot_ages()
+                stale = [r for r in regions if force or ages.get(r, float("inf")) > max_age_seconds]
+                if not stale:
+                        return []
+                for region, instances, elapsed, error in list_ec2_instances_all_regions(stale, max_workers=max_workers):
+                        if error:
+                                # keep the previous snapshot rather than wiping the region
+                                continue
+                        self.replace_region(region, instances)
+                        logger.info("Refreshed %s: %d instances in %.2fs", region, len(instances), elapsed)
+                return stale
+
+        def query(self, state: Optional[str] = None, instance_type: Optional[str] = None, vpc_id: Optional[str] = None, region: Optional[str] = None, tags: Optional[dict] = None) -> List[dict]:
+                """Filter the snapshot; instance_type accepts globs such as 'm5.*'."""
+                sql = "SELECT record FROM instance WHERE 1 = 1"
+                params = []
+                for column, op, value in (("state", "=", state), ("instance_type", "GLOB", instance_type), ("vpc_id", "=", vpc_id), ("region", "=", region)):
+                        if value:
+                                sql += " AND %s %s ?" % (column, op)
+                                params.append(value)
+                for key, value in (tags or {}).items():
+                        sql += " AND instance_id IN (SELECT instance_id FROM tag WHERE key = ? AND value = ?)"
+                        params.extend([key, value])
+                return [json.loads(row[0]) for row in self.conn.execute(sql + " ORDER BY region, instance_id", params)]
+
+        def close(self):
+                self.conn.close()
+
+
 def start_ec2_instance(instance_id: str, region: Optional[str] = None):
         ec2 = get_client("ec2", region)
         try:
@@ -122,23 +425,284 @@ def create_s3_bucket(bucket_name: str, region: Optional[str] = None):
                 return False
 
 
-def upload_file_to_s3(bucket: str, key: str, file_path: str):
+MB = 1024 * 1024
+# S3 multipart limits: parts are >= 5 MiB (except the last) and at most 10000 per upload
+S3_MIN_PART_SIZE = 5 * MB
+S3_MAX_PARTS = 10000
+
+
+class TransferProgress:
+        """Thread-safe byte counter usable as a boto3 transfer Callback."""
+
+        def __init__(self, label: str, total: int, already: int = 0, interval: float = 2.0):
+                self.label = label
+                self.total = total
+                self.seen = already
+                self.already = already
+                self.started = time.perf_counter()
+                self.interval = interval
+                self.last_report = 0.0
+                self.lock = threading.Lock()
+
+        def __call__(self, nbytes: int):
+                with self.lock:
+                        self.seen += nbytes
+                        now = time.perf_counter()
+                        if now - self.last_report < self.interval and self.seen < self.total:
+                                return
+                        self.last_report = now
+                        seen = self.seen
+                logger.info("%s: %.1f/%.1f MiB (%.0f%%) at %.1f MiB/s", self.label, seen / MB, self.total / MB, 100.0 * seen / self.total if self.total else 100.0, self.throughput() / MB)
+
+        def throughput(self) -> float:
+                elapsed = time.perf_counter() - self.started
+                return (self.seen - self.already) / elapsed if elapsed > 0 else 0.0
+
+
+def _upload_manifest_path(file_path: str) -> str:
+        return file_path + ".s3upload.json"
+
+
+def _upload_part(s3, bucket: str, key: str, upload_id: str, file_path: str, part_number: int, offset: int, length: int, progress: TransferProgress) -> Tuple[int, str]:
+        with open(file_path, "rb") as f:
+                f.seek(offset)
+                body = f.read(length)
+        resp = s3.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body)
+        progress(length)
+        return part_number, resp["ETag"]
+
+
+def _abort_stale_upload(s3, manifest: dict):
+        """Abort the multipart upload a stale manifest points at, so its parts stop being billed."""
+        upload_id = manifest.get("upload_id")
+        if not upload_id:
+                return
+        try:
+                s3.abort_multipart_upload(Bucket=manifest["bucket"], Key=manifest["key"], UploadId=upload_id)
+                logger.info("Aborted stale multipart upload %s for s3://%s/%s", upload_id, manifest["bucket"], manifest["key"])
+        except ClientError as e:
+                if e.response.get("Error", {}).get("Code") != "NoSuchUpload":
+                        raise
+
+
+def discard_upload_manifest(file_path: str, manifest_path: Optional[str] = None):
+        """Abort the upload recorded in a file's manifest (if any) and remove the manifest."""
+        manifest_path = manifest_path or _upload_manifest_path(file_path)
+        manifest = _read_checkpoint(manifest_path)
+        if manifest:
+                _abort_stale_upload(get_client("s3"), manifest)
+        if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+
+
+def multipart_upload_resumable(bucket: str, key: str, file_path: str, part_size: int = 64 * MB, concurrency: int = 8, manifest_path: Optional[str] = None) -> dict:
+        """Upload a file in parallel parts, resuming a matching upload from its manifest."""
         s3 = get_client("s3")
+        manifest_path = manifest_path or _upload_manifest_path(file_path)
+        st = os.stat(file_path)
+        # grow the part size if the file would need more than 10000 parts
+        part_size = max(S3_MIN_PART_SIZE, part_size, -(-st.st_size // S3_MAX_PARTS))
+        identity = {"bucket": bucket, "key": key, "size": st.st_size, "mtime": st.st_mtime}
+
+        manifest = _read_checkpoint(manifest_path)
+        if manifest and all(manifest.get(k) == v for k, v in identity.items()):
+                part_size = manifest["part_size"]
+                try:
+                        # trust S3, not the manifest, for which parts actually landed
+                        done = {}
+                        for page in s3.get_paginator("list_parts").paginate(Bucket=bucket, Key=key, UploadId=manifest["upload_id"]):
+                                for part in page.get("Parts", []):
+                                        done[part["PartNumber"]] = part["ETag"]
+                        manifest["parts"] = {str(n): etag for n, etag in done.items()}
+                        logger.info("Resuming upload %s with %d parts already uploaded", manifest["upload_id"], len(done))
+                except ClientError as e:
+                        logger.warning("Cannot resume upload %s (%s); starting over", manifest.get("upload_id"), e)
+                        _abort_stale_upload(s3, manifest)
+                        manifest = None
+        else:
+                if manifest:
+                        # the file, bucket or key changed since the manifest was written
+                        _abort_stale_upload(s3, manifest)
+                manifest = None
+        if manifest is None:
+                resp = s3.create_multipart_upload(Bucket=bucket, Key=key)
+                manifest = dict(identity, upload_id=resp["UploadId"], part_size=part_size, parts={})
+                _write_checkpoint(manifest_path, manifest)
+
+        upload_id = manifest["upload_id"]
+        parts = manifest["parts"]
+        offsets = [(n + 1, off, min(part_size, st.st_size - off)) for n, off in enumerate(range(0, max(st.st_size, 1), part_size))]
+        todo = [p for p in offsets if str(p[0]) not in parts]
+        already = sum(length for n, _, length in offsets if str(n) in parts)
+        progress = TransferProgress("s3://%s/%s" % (bucket, key), st.st_size, already)
+
+        lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                futures = [pool.submit(_upload_part, s3, bucket, key, upload_id, file_path, n, off, length, progress) for n, off, length in todo]
+                for fut in as_completed(futures):
+                        n, etag = fut.result()
+                        with lock:
+                                parts[str(n)] = etag
+                                _write_checkpoint(manifest_path, manifest)
+
+        s3.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": [{"PartNumber": int(n), "ETag": etag} for n, etag in sorted(parts.items(), key=lambda item: int(item[0]))]},
+        )
+        os.remove(manifest_path)
+        return {"bytes": st.st_size, "parts": len(offsets), "part_size": part_size, "uploaded_bytes": st.st_size - already, "mib_per_second": round(progress.throughput() / MB, 2)}
+
+
+def upload_file_to_s3(bucket: str, key: str, file_path: str, part_size_mb: int = 64, concurrency: int = 8, resume: bool = True):
         try:
-                s3.upload_file(Filename=file_path, Bucket=bucket, Key=key)
-                logger.info("Uploaded %s to s3://%s/%s", file_path, bucket, key)
+                size = os.path.getsize(file_path)
+                if not resume:
+                        discard_upload_manifest(file_path)
+                if resume and size > part_size_mb * MB:
+                        stats = multipart_upload_resumable(bucket, key, file_path, part_size=part_size_mb * MB, concurrency=concurrency)
+                        logger.info("Uploaded %s to s3://%s/%s (%d parts, %.1f MiB/s)", file_path, bucket, key, stats["parts"], stats["mib_per_second"])
+                        return True
+                s3 = get_client("s3")
+                config = TransferConfig(multipart_threshold=part_size_mb * MB, multipart_chunksize=part_size_mb * MB, max_concurrency=concurrency)
+                progress = TransferProgress("s3://%s/%s" % (bucket, key), size)
+                s3.upload_file(Filename=file_path, Bucket=bucket, Key=key, Config=config, Callback=progress)
+                logger.info("Uploaded %s to s3://%s/%s (%.1f MiB/s)", file_path, bucket, key, progress.throughput() / MB)
                 return True
         except ClientError as e:
                 logger.error("Failed to upload file %s to %s/%s: %s", file_path, bucket, key, e)
                 return False
 
 
-def deploy_to_s3(bucket: str, key: str, file_path: str):
-        return upload_file_to_s3(bucket, key, file_path)
+def deploy_to_s3(bucket: str, key: str, file_path: str, part_size_mb: int = 64, concurrency: int = 8, resume: bool = True):
+        return upload_file_to_s3(bucket, key, file_path, part_size_mb=part_size_mb, concurrency=concurrency, resume=resume)
+
+
+SYNC_MANIFEST_NAME = ".s3sync-manifest.json"
+
 
+def _file_md5(path: str, chunk_size: int = 8 * MB) -> str:
+        h = hashlib.md5()
+        with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                        h.update(chunk)
+        return h.hexdigest()
 
-def trigger_codedeploy_deployment(application_name: str, deployment_group: str, s3_bucket: str, s3_key: str, bundle_type: str = "zip"):
-        codedeploy = get_client("codedeploy")
+
+def _scan_local_tree(local_dir: str) -> dict:
+        files = {}
+        for root, dirs, names in os.walk(local_dir):
+                dirs.sort()
+                for name in names:
+                        if name == SYNC_MANIFEST_NAME:
+                                continue
+                        path = os.path.join(root, name)
+                        st = os.stat(path)
+                        rel = os.path.relpath(path, local_dir).replace(os.sep, "/")
+                        files[rel] = {"size": st.st_size, "mtime": st.st_mtime}
+        return files
+
+
+def _list_remote_objects(bucket: str, prefix: str) -> dict:
+        s3 = get_client("s3")
+        remote = {}
+        for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                        remote[obj["Key"]] = {"size": obj["Size"], "etag": obj["ETag"].strip('"')}
+        return remote
+
+
+def sync_directory_to_s3(local_dir: str, bucket: str, prefix: str = "", delete: bool = False, workers: int = 8, dry_run: bool = False, manifest_path: Optional[str] = None) -> dict:
+        """Upload only new or changed files, using a (size, mtime, md5, etag) manifest to skip re-hashing."""
+        if prefix and not prefix.endswith("/"):
+                prefix += "/"
+        manifest_path = manifest_path or os.path.join(local_dir, SYNC_MANIFEST_NAME)
+        manifest = _read_checkpoint(manifest_path)
+        if manifest.get("bucket") != bucket or manifest.get("prefix") != prefix:
+                manifest = {"bucket": bucket, "prefix": prefix, "files": {}}
+        known = manifest["files"]
+
+        started = time.perf_counter()
+        local = _scan_local_tree(local_dir)
+        remote = _list_remote_objects(bucket, prefix)
+
+        uploads = []
+        for rel, info in local.items():
+                entry = known.get(rel)
+                if entry and entry["size"] == info["size"] and entry["mtime"] == info["mtime"]:
+                        md5 = entry["md5"]
+                else:
+                        md5 = _file_md5(os.path.join(local_dir, rel))
+                obj = remote.get(prefix + rel)
+                unchanged = (
+                        obj is not None
+                        and obj["size"] == info["size"]
+                        and entry is not None
+                        and entry["md5"] == md5
+                        # someone else overwrote the object if its etag moved
+                        and entry.get("etag") in (None, obj["etag"])
+                ) or (obj is not None and obj["etag"] == md5)
+                known[rel] = dict(info, md5=md5, etag=obj["etag"] if unchanged else None)
+                if not unchanged:
+                        uploads.append(rel)
+        for rel in list(known):
+                if rel not in local:
+                        del known[rel]
+        deletes = sorted(k for k in remote if k[len(prefix):] not in local) if delete else []
+
+        stats = {"local_files": len(local), "remote_objects": len(remote), "uploaded": 0, "deleted": 0, "failed": 0, "dry_run": dry_run}
+        if dry_run:
+                stats.update(to_upload=len(uploads), to_delete=len(deletes))
+                return stats
+
+        s3 = get_client("s3")
+        config = TransferConfig(max_concurrency=2)
+
+        def upload(rel: str) -> str:
+                s3.upload_file(Filename=os.path.join(local_dir, rel), Bucket=bucket, Key=prefix + rel, Config=config)
+                return rel
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                futures = {pool.submit(upload, rel): rel for rel in uploads}
+                for fut in as_completed(futures):
+                        try:
+                                fut.result()
+                                stats["uploaded"] += 1
+                        except (ClientError, OSError) as e:
+                                rel = futures[fut]
+                                logger.error("Failed to upload %s: %s", rel, e)
+                                # forget the file so the next run retries it
+                                known.pop(rel, None)
+                                stats["failed"] += 1
+
+        for i in range(0, len(deletes), 1000):
+                batch = deletes[i : i + 1000]
+                resp = s3.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": k} for k in batch], "Quiet": True})
+                for err in resp.get("Errors", []):
+                        logger.error("Failed to delete %s: %s", err.get("Key"), err.get("Message"))
+                stats["deleted"] += len(batch) - len(resp.get("Errors", []))
+
+        _write_checkpoint(manifest_path, manifest)
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info("Synced %s to s3://%s/%s: %d uploaded, %d deleted, %d failed in %.2fs", local_dir, bucket, prefix, stats["uploaded"], stats["deleted"], stats["failed"], stats["seconds"])
+        return stats
+
+
+def benchmark_upload(bucket: str, file_path: str, part_sizes_mb: List[int], concurrency: int = 8, key_prefix: str = "bench/") -> List[dict]:
+        """Upload file_path once per part size and report throughput (AWS_ENDPOINT_URL may point at moto_server)."""
+        rows = []
+        for mb in part_sizes_mb:
+                key = "%s%s.%dmb" % (key_prefix, os.path.basename(file_path), mb)
+                started = time.perf_counter()
+                stats = multipart_upload_resumable(bucket, key, file_path, part_size=mb * MB, concurrency=concurrency, manifest_path=_upload_manifest_path(file_path) + ".bench")
+                elapsed = time.perf_counter() - started
+                rows.append({"part_size_mb": stats["part_size"] // MB, "parts": stats["parts"], "seconds": round(elapsed, 3), "mib_per_second": round(stats["bytes"] / MB / elapsed, 2)})
+        return rows
+
+
+def trigger_codedeploy_deployment(application_name: str, deployment_group: str, s3_bucket: str, s3_key: str, bundle_type: str = "zip", client=None):
+        codedeploy = client or get_client("codedeploy")
         revision = {
                 "revisionType": "S3",
                 "s3Location": {
@@ -162,90 +726,609 @@ def trigger_codedeploy_deployment(application_name: str, deployment_group: str,
                 raise
 
 
-# CloudWatch Logs
-def fetch_cloudwatch_logs(log_group_name: str, start_time_seconds: Optional[int] = None, end_time_seconds: Optional[int] = None, filter_pattern: Optional[str] = None, limit: int = 100, region: Optional[str] = None):
-        logs = get_client("logs", region)
-        kwargs = {
-                "logGroupName": log_group_name,
-                "limit": limit,
+CODEDEPLOY_TERMINAL = {"Succeeded", "Failed", "Stopped"}
+
+
+def poll_codedeploy_deployments(deployment_ids: List[str], client=None) -> dict:
+        """Return {deploymentId: deploymentInfo}, 25 ids per batch_get_deployments call."""
+        codedeploy = client or get_client("codedeploy")
+        infos = {}
+        for i in range(0, len(deployment_ids), 25):
+                resp = codedeploy.batch_get_deployments(deploymentIds=deployment_ids[i : i + 25])
+                for info in resp.get("deploymentsInfo", []):
+                        infos[info["deploymentId"]] = info
+        return infos
+
+
+def rollout_codedeploy(application_name: str, deployment_groups: List[str], s3_bucket: str, s3_key: str, bundle_type: str = "zip", wave_size: int = 5, max_failures: int = 0, min_poll: float = 2.0, max_poll: float = 30.0, on_event: Optional[Callable[[dict], None]] = None, client=None) -> dict:
+        """Deploy one revision to many groups in waves, stopping once more than max_failures fail."""
+        if wave_size < 1:
+                raise ValueError("wave_size must be at least 1, got %r" % wave_size)
+        codedeploy = client or get_client("codedeploy")
+        emit = on_event or (lambda event: None)
+        started = time.perf_counter()
+        statuses = {}
+        groups_by_id = {}
+        failed = []
+        aborted = False
+        waves = [deployment_groups[i : i + wave_size] for i in range(0, len(deployment_groups), wave_size)]
+
+        for wave_no, wave in enumerate(waves, 1):
+                in_flight = []
+                for group in wave:
+                        if len(failed) > max_failures:
+                                break
+                        try:
+                                deployment_id = trigger_codedeploy_deployment(application_name, group, s3_bucket, s3_key, bundle_type=bundle_type, client=codedeploy)
+                        except ClientError as e:
+                                failed.append(group)
+                                emit({"wave": wave_no, "group": group, "status": "CreateFailed", "error": str(e)})
+                                continue
+                        groups_by_id[deployment_id] = group
+                        statuses[deployment_id] = "Created"
+                        in_flight.append(deployment_id)
+                        emit({"wave": wave_no, "group": group, "deploymentId": deployment_id, "status": "Created"})
+
+                delay = min_poll
+                while in_flight and len(failed) <= max_failures:
+                        time.sleep(delay)
+                        changed = False
+                        for deployment_id, info in poll_codedeploy_deployments(in_flight, client=codedeploy).items():
+                                status = info.get("status")
+                                if status == statuses.get(deployment_id):
+                                        continue
+                                changed = True
+                                statuses[deployment_id] = status
+                                event = {"wave": wave_no, "group": groups_by_id[deployment_id], "deploymentId": deployment_id, "status": status, "elapsed": round(time.perf_counter() - started, 1)}
+                                if status in ("Failed", "Stopped") and info.get("errorInformation"):
+                                        event["error"] = info["errorInformation"].get("message")
+                                emit(event)
+                                if status in CODEDEPLOY_TERMINAL:
+                                        in_flight.remove(deployment_id)
+                                        if status != "Succeeded":
+                                                failed.append(groups_by_id[deployment_id])
+                        delay = min_poll if changed else min(max_poll, delay * 1.5)
+
+                if len(failed) > max_failures:
+                        aborted = True
+                        remaining = [g for w in waves[wave_no:] for g in w]
+                        logger.error("Failure threshold exceeded (%d > %d); not starting %d remaining groups", len(failed), max_failures, len(remaining))
+                        break
+
+        succeeded = [groups_by_id[d] for d, st in statuses.items() if st == "Succeeded"]
+        return {
+                "succeeded": succeeded,
+                "failed": failed,
+                "in_progress": [groups_by_id[d] for d, st in statuses.items() if st not in CODEDEPLOY_TERMINAL],
+                "not_started": [g for g in deployment_groups if g not in succeeded and g not in failed and g not in groups_by_id.values()],
+                "aborted": aborted,
+                "seconds": round(time.perf_counter() - started, 1),
         }
+
+
+# CloudWatch Logs
+def _log_filter_kwargs(log_group_name: str, start_time_seconds: Optional[int] = None, end_time_seconds: Optional[int] = None, filter_pattern: Optional[str] = None) -> dict:
+        kwargs = {"logGroupName": log_group_name}
         if filter_pattern:
                 kwargs["filterPattern"] = filter_pattern
         if start_time_seconds:
                 kwargs["startTime"] = int(start_time_seconds * 1000)
         if end_time_seconds:
                 kwargs["endTime"] = int(end_time_seconds * 1000)
+        return kwargs
+
+
+def iter_cloudwatch_log_events(log_group_name: str, start_time_seconds: Optional[int] = None, end_time_seconds: Optional[int] = None, filter_pattern: Optional[str] = None, region: Optional[str] = None, starting_token: Optional[str] = None, on_page: Optional[Callable[[Optional[str]], None]] = None) -> Iterator[dict]:
+        """Yield log events from starting_token, calling on_page with the next token after each page."""
+        logs = get_client("logs", region)
+        kwargs = _log_filter_kwargs(log_group_name, start_time_seconds, end_time_seconds, filter_pattern)
+        if starting_token:
+                kwargs["PaginationConfig"] = {"StartingToken": starting_token}
+        for page in logs.get_paginator("filter_log_events").paginate(**kwargs):
+                yield from page.get("events", [])
+                if on_page:
+                        on_page(page.get("nextToken"))
+
+
+def fetch_cloudwatch_logs(log_group_name: str, start_time_seconds: Optional[int] = None, end_time_seconds: Optional[int] = None, filter_pattern: Optional[str] = None, limit: int = 100, region: Optional[str] = None):
         try:
-                events = []
-                resp = logs.filter_log_events(**kwargs)
-                events.extend(resp.get("events", []))
-                # handle pagination
-                next_token = resp.get("nextToken")
-                while next_token and len(events) < limit:
-                        resp = logs.filter_log_events(logGroupName=log_group_name, nextToken=next_token, limit=limit)
-                        events.extend(resp.get("events", []))
-                        next_token = resp.get("nextToken")
+                events = list(itertools.islice(iter_cloudwatch_log_events(log_group_name, start_time_seconds, end_time_seconds, filter_pattern, region=region), limit or None))
                 logger.info("Fetched %d log events from %s", len(events), log_group_name)
-                return events[:limit]
+                return events
         except ClientError as e:
                 logger.error("Failed to fetch logs for %s: %s", log_group_name, e)
                 return []
 
 
+def _fetch_log_slice(log_group_name: str, start_ms: int, end_ms: int, filter_pattern: Optional[str], region: Optional[str], max_events: int, skip_ids: frozenset):
+        """Fetch one slice; returns (events, resume_ms, ids seen at resume_ms), resume_ms None once drained."""
+        logs = get_client("logs", region)
+        kwargs = {"logGroupName": log_group_name, "startTime": start_ms, "endTime": end_ms}
+        if filter_pattern:
+                kwargs["filterPattern"] = filter_pattern
+        events = []
+        for page in logs.get_paginator("filter_log_events").paginate(**kwargs):
+                events.extend(ev for ev in page.get("events", []) if ev.get("eventId") not in skip_ids)
+                if page.get("nextToken") and len(events) >= max_events:
+                        events.sort(key=lambda ev: ev["timestamp"])
+                        resume_ms = events[-1]["timestamp"]
+                        seen = frozenset(ev.get("eventId") for ev in events if ev["timestamp"] == resume_ms)
+                        if resume_ms > start_ms or not skip_ids:
+                                return events, resume_ms, seen
+        events.sort(key=lambda ev: ev["timestamp"])
+        return events, None, frozenset()
+
+
+def fetch_cloudwatch_logs_parallel(log_group_name: str, start_time_seconds: int, end_time_seconds: int, filter_pattern: Optional[str] = None, slices: int = 8, max_workers: int = 4, max_events_per_slice: int = 10000, region: Optional[str] = None, limit: int = 0) -> Tuple[List[dict], dict]:
+        """Fetch a time window as parallel slices (split when dense, halved when throttled) merged by timestamp."""
+        start_ms = int(start_time_seconds * 1000)
+        end_ms = int(end_time_seconds * 1000)
+        slices = max(1, slices)
+        if limit:
+                # no slice can contribute more than the first `limit` events overall
+                max_events_per_slice = min(max_events_per_slice, limit)
+        step = max(1, (end_ms - start_ms + 1) // slices)
+        pending = []  # (lo, hi, skip_ids, attempt, not_before)
+        lo = start_ms
+        while lo <= end_ms:
+                hi = min(end_ms, lo + step - 1)
+                pending.append((lo, hi, frozenset(), 0, 0.0))
+                lo = hi + 1
+
+        runs = []
+        stats = {"slices": 0, "splits": 0, "throttled": 0, "events": 0}
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+                in_flight = {}
+                while pending or in_flight:
+                        now = time.monotonic()
+                        ready = [p for p in pending if p[4] <= now]
+                        while ready and len(in_flight) < max_workers * 2:
+                                item = ready.pop()
+                                pending.remove(item)
+                                lo, hi, skip, attempt, _ = item
+                                fut = pool.submit(_fetch_log_slice, log_group_name, lo, hi, filter_pattern, region, max_events_per_slice, skip)
+                                in_flight[fut] = (lo, hi, skip, attempt)
+                        # wake up for the next finished slice or the next backed-off slice, whichever comes first
+                        timeout = max(0.0, min(p[4] for p in pending) - now) if pending else None
+                        if not in_flight:
+                                time.sleep(timeout or 0)
+                                continue
+                        done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                        for fut in done:
+                                lo, hi, skip, attempt = in_flight.pop(fut)
+                                try:
+                                        events, resume_ms, seen = fut.result()
+                                except ClientError as e:
+                                        if e.response.get("Error", {}).get("Code") != "ThrottlingException" or attempt >= 8:
+                                                raise
+                                        stats["throttled"] += 1
+                                        not_before = time.monotonic() + min(20.0, 0.25 * (2 ** attempt)) * (0.5 + random.random())
+                                        # smaller slices mean shorter pagination runs per request burst
+                                        mid = lo + (hi - lo) // 2
+                                        pending.append((lo, mid, skip, attempt + 1, not_before))
+                                        if mid < hi:
+                                                pending.append((mid + 1, hi, frozenset(), attempt + 1, not_before))
+                                        continue
+                                stats["slices"] += 1
+                                runs.append(events)
+                                if limit and len(events) >= limit:
+                                        # everything after this run comes after `limit` earlier events
+                                        continue
+                                if resume_ms is not None:
+                                        # dense slice: split what is left so more workers share it
+                                        stats["splits"] += 1
+                                        mid = resume_ms + (hi - resume_ms) // 2
+                                        pending.append((resume_ms, mid, seen, 0, 0.0))
+                                        if mid < hi:
+                                                pending.append((mid + 1, hi, frozenset(), 0, 0.0))
+        merged = list(heapq.merge(*runs, key=lambda ev: ev["timestamp"]))
+        if limit:
+                merged = merged[:limit]
+        elapsed = time.perf_counter() - started
+        stats["events"] = len(merged)
+        stats["seconds"] = round(elapsed, 3)
+        stats["events_per_second"] = round(len(merged) / elapsed, 1) if elapsed > 0 else 0.0
+        logger.info("Fetched %d log events from %s in %.2fs (%.1f events/s, %d slices, %d splits, %d throttled)", len(merged), log_group_name, elapsed, stats["events_per_second"], stats["slices"], stats["splits"], stats["throttled"])
+        return merged, stats
+
+
+def _read_checkpoint(path: Optional[str]) -> dict:
+        if not path or not os.path.exists(path):
+                return {}
+        with open(path) as f:
+                return json.load(f)
+
+
+def _write_checkpoint(path: str, state: dict):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+                json.dump(state, f)
+        os.replace(tmp, path)
+
+
+def export_cloudwatch_logs(log_group_name: str, start_time_seconds: Optional[int] = None, end_time_seconds: Optional[int] = None, filter_pattern: Optional[str] = None, out_path: Optional[str] = None, checkpoint_path: Optional[str] = None, region: Optional[str] = None) -> int:
+        """Stream events as NDJSON to stdout or a (.gz) file, resumable from a checkpoint tied to the query."""
+        state = _read_checkpoint(checkpoint_path)
+        query = {"group": log_group_name, "filter": filter_pattern, "start": start_time_seconds, "end": end_time_seconds, "region": region}
+        if (state.get("nextToken") or state.get("done")) and state.get("query") != query:
+                # a nextToken is only meaningful for the exact query that produced it
+                raise ValueError("Checkpoint %s belongs to a different export (%s); refusing to resume" % (checkpoint_path, state.get("query")))
+        state["query"] = query
+        if state.get("done"):
+                logger.info("Checkpoint %s marks export as complete", checkpoint_path)
+                return state.get("events", 0)
+        starting_token = state.get("nextToken")
+        written = state.get("events", 0)
+        if starting_token:
+                logger.info("Resuming export of %s after %d events", log_group_name, written)
+
+        if out_path is None:
+                out = sys.stdout
+        elif out_path.endswith(".gz"):
+                # appending adds a new gzip member, which readers concatenate transparently
+                out = gzip.open(out_path, "at" if starting_token else "wt", encoding="utf-8")
+        else:
+                out = open(out_path, "a" if starting_token else "w", encoding="utf-8")
+
+        counter = [written]
+
+        def checkpoint(next_token: Optional[str]):
+                out.flush()
+                if checkpoint_path:
+                        state.update({"nextToken": next_token, "events": counter[0], "done": next_token is None})
+                        _write_checkpoint(checkpoint_path, state)
+
+        try:
+                for ev in iter_cloudwatch_log_events(log_group_name, start_time_seconds, end_time_seconds, filter_pattern, region=region, starting_token=starting_token, on_page=checkpoint):
+                        out.write(json.dumps(ev, default=str))
+                        out.write("\n")
+                        counter[0] += 1
+        finally:
+                if out is not sys.stdout:
+                        out.close()
+        logger.info("Exported %d log events from %s", counter[0], log_group_name)
+        return counter[0]
+
+
 # Sentiment analysis using AWS Comprehend
-def analyze_sentiment_texts(texts: List[str], language_code: str = "en", region: Optional[str] = None):
-        if not texts:
-                return []
-        comprehend = get_client("comprehend", region)
+# Per-document error codes that will fail again no matter how often we retry
+COMPREHEND_PERMANENT_ERRORS = {"TextSizeLimitExceededException", "UnsupportedLanguageException", "InvalidRequestException"}
+
+
+class TokenBucket:
+        """Thread-safe token bucket: acquire() blocks until a token is available."""
+
+        def __init__(self, rate_per_second: float, capacity: Optional[float] = None):
+                self.rate = float(rate_per_second)
+                self.capacity = float(capacity if capacity is not None else max(1.0, rate_per_second))
+                self.tokens = self.capacity
+                self.updated = time.monotonic()
+                self.lock = threading.Lock()
+
+        def acquire(self, tokens: float = 1.0):
+                while True:
+                        with self.lock:
+                                now = time.monotonic()
+                                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                                self.updated = now
+                                if self.tokens >= tokens:
+                                        self.tokens -= tokens
+                                        return
+                                wait_for = (tokens - self.tokens) / self.rate
+                        time.sleep(wait_for)
+
+
+def _backoff(attempt: int, base: float = 0.2, cap: float = 10.0) -> float:
+        # full jitter
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _detect_sentiment_batch(comprehend, texts: List[str], positions: List[int], language_code: str, bucket: Optional[TokenBucket], max_retries: int, labels: Optional[Sequence[Any]] = None) -> List[dict]:
+        """Run one batch, retrying only the documents reported in ErrorList."""
         results = []
-        # Comprehend batch_detect_sentiment supports up to 25 documents per call
-        batch_size = 25
-        for i in range(0, len(texts), batch_size):
-                batch = texts[i : i + batch_size]
+        attempt = 0
+        while positions:
+                if bucket:
+                        bucket.acquire()
+                batch = [texts[i] for i in positions]
                 try:
                         resp = comprehend.batch_detect_sentiment(TextList=batch, LanguageCode=language_code)
-                        for idx, res in enumerate(resp.get("ResultList", [])):
-                                results.append(
-                                        {
-                                                "Index": res.get("Index"),
-                                                "Sentiment": res.get("Sentiment"),
-                                                "SentimentScore": res.get("SentimentScore"),
-                                                "Text": batch[res.get("Index")],
-                                        }
-                                )
-                        for err in resp.get("ErrorList", []):
-                                logger.warning("Comprehend error for index %s: %s", err.get("Index"), err.get("ErrorMessage"))
                 except ClientError as e:
-                        logger.error("Comprehend batch error: %s", e)
+                        code = e.response.get("Error", {}).get("Code")
+                        if code not in ("ThrottlingException", "TooManyRequestsException", "InternalServerException") or attempt >= max_retries:
+                                logger.error("Comprehend batch error: %s", e)
+                                return results
+                        time.sleep(_backoff(attempt))
+                        attempt += 1
+                        continue
+                for res in resp.get("ResultList", []):
+                        pos = positions[res.get("Index")]
+                        results.append(
+                                {
+                                        "Index": pos,
+                                        "Sentiment": res.get("Sentiment"),
+                                        "SentimentScore": res.get("SentimentScore"),
+                                        "Text": texts[pos],
+                                }
+                        )
+                retry = []
+                for err in resp.get("ErrorList", []):
+                        pos = positions[err.get("Index")]
+                        if err.get("ErrorCode") in COMPREHEND_PERMANENT_ERRORS or attempt >= max_retries:
+                                logger.warning("Comprehend error for index %s: %s", labels[pos] if labels else pos, err.get("ErrorMessage"))
+                        else:
+                                retry.append(pos)
+                positions = retry
+                if positions:
+                        time.sleep(_backoff(attempt))
+                        attempt += 1
+        return results
+
+
+def analyze_sentiment_texts(texts: List[str], language_code: str = "en", region: Optional[str] = None, max_in_flight: int = 4, rate_per_second: Optional[float] = None, max_retries: int = 5, client=None, labels: Optional[Sequence[Any]] = None):
+        """Detect sentiment with up to max_in_flight batches running; results keep input order, labels name texts in error logs."""
+        if not texts:
+                return []
+        comprehend = client or get_client("comprehend", region)
+        bucket = TokenBucket(rate_per_second) if rate_per_second else None
+        # Comprehend batch_detect_sentiment supports up to 25 documents per call
+        batch_size = 25
+        batches = [list(range(i, min(i + batch_size, len(texts)))) for i in range(0, len(texts), batch_size)]
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+                futures = [pool.submit(_detect_sentiment_batch, comprehend, texts, positions, language_code, bucket, max_retries, labels) for positions in batches]
+                for fut in as_completed(futures):
+                        results.extend(fut.result())
+        results.sort(key=lambda r: r["Index"])
         return results
 
 
-def analyze_logs_sentiment(log_group_name: str, start_seconds_ago: int = 3600, language_code: str = "en", region: Optional[str] = None, limit: int = 100):
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "aws_manager", "sentiment.sqlite")
+_whitespace_re = re.compile(r"\s+")
+# Comprehend limits documents by UTF-8 bytes, not characters
+COMPREHEND_MAX_BYTES = 5000
+_TS = r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"
+_UUID = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+# "<timestamp>\t<request id>\t<LEVEL>\t" written by the Lambda runtimes
+_lambda_prefix_re = re.compile(r"\s*(?:%s\s+)?(?:%s\s+)?(?:(?:INFO|WARN|WARNING|ERROR|DEBUG|TRACE|FATAL)\s+)?" % (_TS, _UUID))
+_uuid_re = re.compile(r"(?:RequestId:\s*)?\b%s\b" % _UUID)
+_ts_re = re.compile(_TS)
+# Patterns starting with a literal let the regex engine skip ahead quickly,
+# so these cheap probes gate the expensive full-text substitutions.
+_uuid_hint_re = re.compile(r"-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-")
+_ts_hint_re = re.compile(r":\d\d:\d\d")
+_runtime_lines = ("START RequestId:", "END RequestId:", "REPORT RequestId:", "INIT_START ")
+
+
+def truncate_utf8(text: str, max_bytes: int = COMPREHEND_MAX_BYTES) -> str:
+        """Cut text to at most max_bytes of UTF-8 without splitting a character."""
+        # a code point is at most 4 bytes, and ASCII is 1 byte per character,
+        # so most messages never need to be encoded at all
+        if len(text) * 4 <= max_bytes or (len(text) <= max_bytes and text.isascii()):
+                return text
+        if text.isascii():
+                return text[:max_bytes]
+        data = text.encode("utf-8")
+        if len(data) <= max_bytes:
+                return text
+        return data[:max_bytes].decode("utf-8", "ignore")
+
+
+def clean_log_message(msg: str, max_bytes: int = COMPREHEND_MAX_BYTES) -> str:
+        if msg.startswith(_runtime_lines):
+                return ""
+        prefix = _lambda_prefix_re.match(msg)
+        if prefix and prefix.end():
+                msg = msg[prefix.end():]
+        if _uuid_hint_re.search(msg):
+                msg = _uuid_re.sub("", msg)
+        if _ts_hint_re.search(msg):
+                msg = _ts_re.sub("", msg)
+        # str.split() is several times faster than a \s+ regex for this
+        return truncate_utf8(" ".join(msg.split()), max_bytes)
+
+
+def preprocess_messages(messages: List[str], max_bytes: int = COMPREHEND_MAX_BYTES) -> List[str]:
+        """Clean and byte-truncate each message once per distinct text, keeping input positions."""
+        memo = {}
+        out = []
+        append = out.append
+        for msg in messages:
+                cleaned = memo.get(msg)
+                if cleaned is None:
+                        cleaned = memo[msg] = clean_log_message(msg, max_bytes)
+                append(cleaned)
+        return out
+
+
+def _time_preprocess(messages: List[str]) -> dict:
+        started = time.perf_counter()
+        cleaned = preprocess_messages(messages)
+        elapsed = time.perf_counter() - started
+        oversize = sum(1 for m in cleaned if len(m.encode("utf-8")) > COMPREHEND_MAX_BYTES)
+        if oversize:
+                raise RuntimeError(f"preprocess_messages returned {oversize} message(s) over {COMPREHEND_MAX_BYTES} bytes")
+        return {
+                "messages": len(messages),
+                "unique": len(set(messages)),
+                "seconds": round(elapsed, 4),
+                "us_per_message": round(elapsed / len(messages) * 1e6, 3) if messages else 0.0,
+        }
+
+
+def benchmark_preprocess(count: int = 100000, unique: int = 5000) -> dict:
+        # all_unique is the per-message cost; duplicated shows what the memo saves on repetitive logs
+        rnd = random.Random(42)
+        words = ["timeout", "success", "failed", "retrying", "connexion", "réessayer", "接続", "エラー", "ok", "user"]
+        templates = [
+                "%s\t%08x-1111-2222-3333-444455556666\tINFO\t%s" % (datetime.datetime(2024, 1, 1).isoformat() + "Z", i, " ".join(rnd.choice(words) for _ in range(rnd.randint(5, 400))))
+                for i in range(max(count, unique))
+        ]
+        unique = max(1, min(unique, count))
+        return {
+                "all_unique": _time_preprocess(templates[:count]),
+                "duplicated": _time_preprocess([templates[rnd.randrange(unique)] for _ in range(count)]),
+        }
+
+
+def normalize_message(text: str) -> str:
+        return _whitespace_re.sub(" ", text).strip()
+
+
+class SentimentCache:
+        """SQLite sentiment results keyed by a hash of (normalized text, language), with TTL and LRU eviction."""
+
+        def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 200000, ttl_seconds: int = 30 * 86400):
+                if path != ":memory:":
+                        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self.conn = sqlite3.connect(path)
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                self.conn.execute(
+                        "CREATE TABLE IF NOT EXISTS sentiment ("
+                        "key TEXT PRIMARY KEY, sentiment TEXT, score TEXT, created REAL, last_used REAL)"
+                )
+                self.conn.execute("CREATE INDEX IF NOT EXISTS sentiment_last_used ON sentiment(last_used)")
+                self.max_entries = max_entries
+                self.ttl_seconds = ttl_seconds
+
+        @staticmethod
+        def make_key(text: str, language_code: str) -> str:
+                return hashlib.sha256((language_code + "\0" + normalize_message(text)).encode("utf-8")).hexdigest()
+
+        def get_many(self, keys: List[str]) -> dict:
+                found = {}
+                now = time.time()
+                cutoff = now - self.ttl_seconds
+                for i in range(0, len(keys), 500):
+                        chunk = keys[i : i + 500]
+                        rows = self.conn.execute(
+                                "SELECT key, sentiment, score FROM sentiment WHERE created >= ? AND key IN (%s)" % ",".join("?" * len(chunk)),
+                                [cutoff, *chunk],
+                        ).fetchall()
+                        for key, sentiment, score in rows:
+                                found[key] = {"Sentiment": sentiment, "SentimentScore": json.loads(score)}
+                if found:
+                        self.conn.executemany("UPDATE sentiment SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+                        self.conn.commit()
+                return found
+
+        def put_many(self, items: dict):
+                now = time.time()
+                self.conn.executemany(
+                        "INSERT OR REPLACE INTO sentiment (key, sentiment, score, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                        [(k, v.get("Sentiment"), json.dumps(v.get("SentimentScore")), now, now) for k, v in items.items()],
+                )
+                self.evict()
+                self.conn.commit()
+
+        def evict(self):
+                self.conn.execute("DELETE FROM sentiment WHERE created < ?", (time.time() - self.ttl_seconds,))
+                (count,) = self.conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()
+                if count > self.max_entries:
+                        self.conn.execute(
+                                "DELETE FROM sentiment WHERE key IN (SELECT key FROM sentiment ORDER BY last_used LIMIT ?)",
+                                (count - self.max_entries,),
+                        )
+
+        def close(self):
+                self.conn.close()
+
+
+def analyze_sentiment_cached(texts: List[str], language_code: str = "en", region: Optional[str] = None, cache: Optional[SentimentCache] = None, **kwargs) -> Tuple[List[dict], dict]:
+        """Deduplicate texts, serve cached results and return (results in input order, stats)."""
+        keys = [SentimentCache.make_key(t, language_code) for t in texts]
+        unique = {}
+        input_positions = {}
+        for idx, (key, text) in enumerate(zip(keys, texts)):
+                unique.setdefault(key, text)
+                input_positions.setdefault(key, []).append(idx)
+        known = cache.get_many(list(unique)) if cache else {}
+        missing = [k for k in unique if k not in known]
+        fresh = {}
+        if missing:
+                # report per-document errors against the caller's input positions
+                labels = [",".join(map(str, input_positions[k])) for k in missing]
+                for res in analyze_sentiment_texts([unique[k] for k in missing], language_code=language_code, region=region, labels=labels, **kwargs):
+                        fresh[missing[res["Index"]]] = {"Sentiment": res["Sentiment"], "SentimentScore": res["SentimentScore"]}
+                if cache and fresh:
+                        cache.put_many(fresh)
+        known.update(fresh)
+        results = []
+        for idx, (key, text) in enumerate(zip(keys, texts)):
+                if key in known:
+                        results.append({"Index": idx, "Text": text, **known[key]})
+        stats = {
+                "messages": len(texts),
+                "unique": len(unique),
+                "deduplicated": len(texts) - len(unique),
+                "cache_hits": len(unique) - len(missing),
+                "comprehend_documents": len(missing),
+                "comprehend_calls": -(-len(missing) // 25),
+                "comprehend_calls_saved": -(-len(texts) // 25) - -(-len(missing) // 25),
+        }
+        # hit_rate is the cache alone (over unique texts); dedup savings are reported separately
+        stats["hit_rate"] = round(stats["cache_hits"] / len(unique), 4) if unique else 0.0
+        stats["documents_saved_rate"] = round(1 - len(missing) / len(texts), 4) if texts else 0.0
+        logger.info("Sentiment cache: %d messages, %d duplicates, %d cached (%.1f%% hit rate), %d sent (%.1f%% of documents saved, %d calls avoided)", stats["messages"], stats["deduplicated"], stats["cache_hits"], stats["hit_rate"] * 100, stats["comprehend_documents"], stats["documents_saved_rate"] * 100, stats["comprehend_calls_saved"])
+        return results, stats
+
+
+def analyze_logs_sentiment(log_group_name: str, start_seconds_ago: int = 3600, language_code: str = "en", region: Optional[str] = None, limit: int = 100, max_in_flight: int = 4, rate_per_second: Optional[float] = None, cache: Optional[SentimentCache] = None):
         now = int(time.time())
         start_time = now - start_seconds_ago
         events = fetch_cloudwatch_logs(log_group_name, start_time_seconds=start_time, end_time_seconds=now, limit=limit, region=region)
-        messages = []
-        for ev in events:
-                msg = ev.get("message", "")
-                if msg:
-                        # Trim long messages for Comprehend; try to keep to < 5000 bytes
-                        if len(msg) > 4000:
-                                msg = msg[:4000]
-                        messages.append(msg)
+        messages = [msg for msg in preprocess_messages([ev.get("message", "") for ev in events]) if msg]
         if not messages:
                 logger.info("No messages to analyze")
                 return []
         logger.info("Analyzing %d messages with Comprehend", len(messages))
-        results = analyze_sentiment_texts(messages, language_code=language_code, region=region)
+        results, _ = analyze_sentiment_cached(messages, language_code=language_code, region=region, cache=cache, max_in_flight=max_in_flight, rate_per_second=rate_per_second)
         return results
 
 
 # Simple CLI
+def tag_filter(value: str) -> Tuple[str, str]:
+        """argparse type for key=value tag filters."""
+        key, sep, tag_value = value.partition("=")
+        if not sep or not key:
+                raise argparse.ArgumentTypeError("expected key=value, got %r" % value)
+        return key, tag_value
+
+
+def positive_int(value: str) -> int:
+        """argparse type for counts that must be at least 1."""
+        try:
+                number = int(value)
+        except ValueError:
+                raise argparse.ArgumentTypeError("expected an integer, got %r" % value)
+        if number < 1:
+                raise argparse.ArgumentTypeError("must be at least 1, got %d" % number)
+        return number
+
+
 def parse_args():
         p = argparse.ArgumentParser(description="AWS resource & logs manager with sentiment and deployment helpers")
         sub = p.add_subparsers(dest="cmd")
 
-        sub.add_parser("list-ec2", help="List EC2 instances")
+        list_ec2 = sub.add_parser("list-ec2", help="List EC2 instances")
+        list_ec2.add_argument("--region", required=False, help="Region")
+        list_ec2.add_argument("--all-regions", action="store_true", help="List instances in every enabled region concurrently")
+        list_ec2.add_argument("--workers", type=int, default=8, help="Max concurrent regions for --all-regions")
+        list_ec2.add_argument("--format", choices=["json", "ndjson"], default="json", help="Output format (--all-regions always streams NDJSON)")
+        list_ec2.add_argument("--fields", required=False, help="Comma-separated fields to keep, e.g. InstanceId,State")
+
+        inventory = sub.add_parser("inventory", help="Query the local EC2 inventory snapshot")
+        inventory.add_argument("--state", required=False, help="Instance state, e.g. running")
+        inventory.add_argument("--type", required=False, help="Instance type or glob, e.g. 'm5.*'")
+        inventory.add_argument("--vpc", required=False, help="VPC ID")
+        inventory.add_argument("--tag", action="append", default=[], type=tag_filter, help="Tag filter key=value (repeatable)")
+        inventory.add_argument("--region", required=False, help="Region (default: client region)")
+        inventory.add_argument("--all-regions", action="store_true", help="Snapshot every enabled region")
+        inventory.add_argument("--refresh", action="store_true", help="Force a refresh before querying")
+        inventory.add_argument("--max-age", type=int, default=900, help="Refresh regions older than this many seconds")
+        inventory.add_argument("--offline", action="store_true", help="Never call AWS; query the snapshot as is")
+        inventory.add_argument("--db", default=DEFAULT_INVENTORY_PATH, help="Inventory database path")
 
         start_ec2 = sub.add_parser("start-ec2", help="Start an EC2 instance")
         start_ec2.add_argument("--id", required=True, help="Instance ID")
@@ -261,19 +1344,55 @@ def parse_args():
         fetch_logs = sub.add_parser("fetch-logs", help="Fetch CloudWatch logs")
         fetch_logs.add_argument("--group", required=True, help="Log group name")
         fetch_logs.add_argument("--start", type=int, default=-3600, help="Start seconds relative to now (negative past)")
-        fetch_logs.add_argument("--limit", type=int, default=100, help="Max events to return")
+        fetch_logs.add_argument("--limit", type=int, default=100, help="Max events to return (0 for no limit)")
+        fetch_logs.add_argument("--slices", type=int, default=1, help="Split the window into N time slices fetched in parallel")
+        fetch_logs.add_argument("--workers", type=int, default=4, help="Worker threads for --slices")
         fetch_logs.add_argument("--region", required=False, help="Region")
 
+        export_logs = sub.add_parser("export-logs", help="Stream all matching CloudWatch log events as NDJSON")
+        export_logs.add_argument("--group", required=True, help="Log group name")
+        export_logs.add_argument("--start", type=int, default=3600, help="Seconds ago to start (e.g. 3600)")
+        export_logs.add_argument("--filter", required=False, help="CloudWatch Logs filter pattern")
+        export_logs.add_argument("--out", required=False, help="Output file (.gz for gzip); stdout if omitted")
+        export_logs.add_argument("--checkpoint", required=False, help="Checkpoint file used to resume an interrupted export")
+        export_logs.add_argument("--region", required=False, help="Region")
+
         analyze_logs = sub.add_parser("analyze-logs", help="Fetch logs and run sentiment analysis")
         analyze_logs.add_argument("--group", required=True, help="Log group name")
         analyze_logs.add_argument("--start", type=int, default=3600, help="Seconds ago to start (e.g. 3600)")
         analyze_logs.add_argument("--language", default="en", help="Language code for Comprehend")
         analyze_logs.add_argument("--region", required=False, help="Region")
+        analyze_logs.add_argument("--in-flight", type=int, default=4, help="Comprehend batches kept in flight")
+        analyze_logs.add_argument("--tps", type=float, required=False, help="Max batch_detect_sentiment calls per second")
+        analyze_logs.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="SQLite sentiment cache path")
+        analyze_logs.add_argument("--no-cache", action="store_true", help="Do not read or write the sentiment cache")
+        analyze_logs.add_argument("--cache-ttl", type=int, default=30 * 86400, help="Cache entry lifetime in seconds")
+        analyze_logs.add_argument("--cache-max", type=int, default=200000, help="Max cached entries before LRU eviction")
 
         deploy = sub.add_parser("deploy-s3", help="Upload artifact to S3")
         deploy.add_argument("--bucket", required=True, help="S3 bucket")
         deploy.add_argument("--key", required=True, help="S3 key")
         deploy.add_argument("--file", required=True, help="Local file path")
+        deploy.add_argument("--part-size", type=int, default=64, help="Multipart part size in MiB")
+        deploy.add_argument("--concurrency", type=int, default=8, help="Parts uploaded in parallel")
+        deploy.add_argument("--no-resume", action="store_true", help="Do not keep a resume manifest next to the file")
+
+        rollout = sub.add_parser("rollout", help="Deploy one S3 revision to many CodeDeploy groups in waves")
+        rollout.add_argument("--app", required=True, help="CodeDeploy application name")
+        rollout.add_argument("--groups", required=True, help="Comma-separated deployment group names, in rollout order")
+        rollout.add_argument("--bucket", required=True, help="S3 bucket")
+        rollout.add_argument("--key", required=True, help="S3 key")
+        rollout.add_argument("--bundle", default="zip", help="Bundle type (zip/tar)")
+        rollout.add_argument("--wave-size", type=positive_int, default=5, help="Groups deployed concurrently per wave")
+        rollout.add_argument("--max-failures", type=int, default=0, help="Stop starting waves once more groups than this fail")
+
+        sync = sub.add_parser("sync", help="Upload new or changed files from a directory to S3")
+        sync.add_argument("--dir", required=True, help="Local directory")
+        sync.add_argument("--bucket", required=True, help="S3 bucket")
+        sync.add_argument("--prefix", default="", help="Key prefix")
+        sync.add_argument("--delete", action="store_true", help="Delete remote objects missing locally")
+        sync.add_argument("--workers", type=int, default=8, help="Parallel uploads")
+        sync.add_argument("--dry-run", action="store_true", help="Only report what would change")
 
         codedeploy = sub.add_parser("codedeploy", help="Trigger CodeDeploy with S3 revision")
         codedeploy.add_argument("--app", required=True, help="CodeDeploy application name")
@@ -282,14 +1401,71 @@ def parse_args():
         codedeploy.add_argument("--key", required=True, help="S3 key")
         codedeploy.add_argument("--bundle", default="zip", help="Bundle type (zip/tar)")
 
+        bench_pre = sub.add_parser("bench-preprocess", help="Benchmark log message preprocessing for Comprehend")
+        bench_pre.add_argument("--count", type=int, default=100000, help="Messages to process")
+        bench_pre.add_argument("--unique", type=int, default=5000, help="Distinct messages in the duplicated run")
+
+        bench_up = sub.add_parser("bench-upload", help="Measure multipart upload throughput by part size")
+        bench_up.add_argument("--bucket", required=True, help="S3 bucket")
+        bench_up.add_argument("--file", required=True, help="Local file path")
+        bench_up.add_argument("--part-sizes", default="8,16,64,128", help="Comma-separated part sizes in MiB")
+        bench_up.add_argument("--concurrency", type=int, default=8, help="Parts uploaded in parallel")
+
+        bench_ec2 = sub.add_parser("bench-list-ec2", help="Benchmark list-ec2 encoding memory and throughput")
+        bench_ec2.add_argument("--count", type=int, default=50000, help="Synthetic instances")
+
+        bench = sub.add_parser("bench-clients", help="Benchmark client construction with and without the registry")
+        bench.add_argument("--service", default="logs", help="Service name")
+        bench.add_argument("--region", default="us-east-1", help="Region")
+        bench.add_argument("--iterations", type=int, default=200, help="Calls per mode")
+
         return p.parse_args()
 
 
 def main():
         args = parse_args()
         if args.cmd == "list-ec2":
-                instances = list_ec2_instances()
-                print(json.dumps(instances, indent=2, default=str))
+                fields = [f.strip() for f in args.fields.split(",") if f.strip()] if args.fields else None
+                if fields:
+                        unknown = set(fields) - set(InstanceRecord._fields)
+                        if unknown:
+                                raise SystemExit("Unknown field(s): %s (choose from %s)" % (", ".join(sorted(unknown)), ", ".join(InstanceRecord._fields)))
+                if args.all_regions:
+                        # one JSON object per line, flushed as each region completes
+                        total = 0
+                        for region, instances, elapsed, error in list_ec2_instances_all_regions(max_workers=args.workers):
+                                write_json_stream(instances, sys.stdout, fields=fields, ndjson=True)
+                                total += len(instances)
+                                # per-region timing goes to the log (stderr), keeping stdout pure instance records
+                                if error:
+                                        logger.warning("%s: %d instances in %.3fs (error: %s)", region, len(instances), elapsed, error)
+                                else:
+                                        logger.info("%s: %d instances in %.3fs", region, len(instances), elapsed)
+                        logger.info("Listed %d instances across all regions", total)
+                        return
+                try:
+                        write_json_stream(iter_ec2_instances(getattr(args, "region", None)), sys.stdout, fields=fields, ndjson=args.format == "ndjson")
+                except ClientError as e:
+                        logger.error("Failed to list EC2 instances: %s", e)
+                return
+
+        if args.cmd == "inventory":
+                inv = Ec2Inventory(args.db)
+                try:
+                        if not args.offline:
+                                if args.all_regions:
+                                        regions = list_ec2_regions()
+                                else:
+                                        regions = [args.region or get_client("ec2").meta.region_name]
+                                inv.refresh(regions, max_age_seconds=args.max_age, force=args.refresh)
+                        tags = dict(args.tag)
+                        results = inv.query(state=args.state, instance_type=args.type, vpc_id=args.vpc, region=args.region, tags=tags)
+                        ages = inv.snapshot_ages()
+                finally:
+                        inv.close()
+                for region, age in sorted(ages.items()):
+                        logger.info("Snapshot %s is %ds old", region, age)
+                print(json.dumps(results, indent=2, default=str))
                 return
 
         if args.cmd == "start-ec2":
@@ -321,25 +1497,80 @@ def main():
                                 start = now + args.start
                         else:
                                 start = now - args.start
-                events = fetch_cloudwatch_logs(args.group, start_time_seconds=start, end_time_seconds=now, limit=args.limit, region=getattr(args, "region", None))
+                if args.slices > 1:
+                        events, _ = fetch_cloudwatch_logs_parallel(args.group, start, now, slices=args.slices, max_workers=args.workers, region=getattr(args, "region", None), limit=args.limit)
+                else:
+                        events = fetch_cloudwatch_logs(args.group, start_time_seconds=start, end_time_seconds=now, limit=args.limit, region=getattr(args, "region", None))
                 print(json.dumps(events, indent=2, default=str))
                 return
 
+        if args.cmd == "export-logs":
+                state = _read_checkpoint(args.checkpoint)
+                # keep the original window on resume so the token stays valid
+                now = state.get("end") or int(time.time())
+                start = now - abs(args.start)
+                if args.checkpoint and not state:
+                        _write_checkpoint(args.checkpoint, {"end": now})
+                try:
+                        export_cloudwatch_logs(args.group, start_time_seconds=start, end_time_seconds=now, filter_pattern=args.filter, out_path=args.out, checkpoint_path=args.checkpoint, region=getattr(args, "region", None))
+                except ValueError as e:
+                        logger.error("%s", e)
+                        sys.exit(1)
+                return
+
         if args.cmd == "analyze-logs":
-                results = analyze_logs_sentiment(args.group, start_seconds_ago=args.start, language_code=args.language, region=getattr(args, "region", None))
+                cache = None if args.no_cache else SentimentCache(args.cache, max_entries=args.cache_max, ttl_seconds=args.cache_ttl)
+                try:
+                        results = analyze_logs_sentiment(args.group, start_seconds_ago=args.start, language_code=args.language, region=getattr(args, "region", None), max_in_flight=args.in_flight, rate_per_second=args.tps, cache=cache)
+                finally:
+                        if cache:
+                                cache.close()
                 print(json.dumps(results, indent=2, default=str))
                 return
 
         if args.cmd == "deploy-s3":
-                ok = deploy_to_s3(args.bucket, args.key, args.file)
+                ok = deploy_to_s3(args.bucket, args.key, args.file, part_size_mb=args.part_size, concurrency=args.concurrency, resume=not args.no_resume)
                 print("OK" if ok else "FAILED")
                 return
 
+        if args.cmd == "rollout":
+                groups = [g.strip() for g in args.groups.split(",") if g.strip()]
+                result = rollout_codedeploy(
+                        args.app, groups, args.bucket, args.key, bundle_type=args.bundle, wave_size=args.wave_size, max_failures=args.max_failures,
+                        on_event=lambda event: print(json.dumps(event), flush=True),
+                )
+                print(json.dumps({"RolloutSummary": result}))
+                if result["failed"] or result["aborted"]:
+                        sys.exit(1)
+                return
+
+        if args.cmd == "sync":
+                stats = sync_directory_to_s3(args.dir, args.bucket, prefix=args.prefix, delete=args.delete, workers=args.workers, dry_run=args.dry_run)
+                print(json.dumps(stats, indent=2))
+                return
+
         if args.cmd == "codedeploy":
                 deployment_id = trigger_codedeploy_deployment(args.app, args.group, args.bucket, args.key, bundle_type=args.bundle)
                 print(json.dumps({"deploymentId": deployment_id}))
                 return
 
+        if args.cmd == "bench-preprocess":
+                print(json.dumps(benchmark_preprocess(args.count, args.unique), indent=2))
+                return
+
+        if args.cmd == "bench-upload":
+                sizes = [int(x) for x in args.part_sizes.split(",") if x.strip()]
+                print(json.dumps(benchmark_upload(args.bucket, args.file, sizes, concurrency=args.concurrency), indent=2))
+                return
+
+        if args.cmd == "bench-list-ec2":
+                print(json.dumps(benchmark_list_ec2(args.count), indent=2))
+                return
+
+        if args.cmd == "bench-clients":
+                print(json.dumps(benchmark_get_client(args.service, args.region, args.iterations), indent=2))
+                return
+
         print("No command provided. Use --help.")
 
 
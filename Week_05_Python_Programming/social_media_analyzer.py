@@ -8,37 +8,146 @@ A comprehensive Python project demonstrating:
 - Real-world application (content analysis and management)
 """
 
+import csv
+import gzip
+import heapq
+import io
 import json
-from datetime import datetime
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from collections import Counter
+from collections.abc import MutableMapping
+from itertools import count, cycle, islice
+from operator import itemgetter
 import re
 
+POSITIVE_WORDS = ['great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'best', 'awesome', 'good', 'happy']
+NEGATIVE_WORDS = ['bad', 'terrible', 'awful', 'hate', 'worst', 'poor', 'disappointing', 'sad', 'angry']
+NEGATION_WORDS = frozenset({'not', 'no', 'never', 'nothing', 'nobody', 'hardly', 'without', 'cannot',
+                            "don't", "doesn't", "didn't", "isn't", "aren't", "wasn't", "weren't",
+                            "won't", "can't", "couldn't", "shouldn't", "wouldn't"})
+
+KEYWORD_RE = re.compile(r'\w+')
+
+# Tokens are whitespace-split words with surrounding punctuation stripped;
+# a word ending in one of CLAUSE_BREAKS closes any open negation window.
+STRIP_CHARS = '.,!?;:"\'()[]{}<>*_~`'
+CLAUSE_BREAKS = frozenset('.!?;,')
+
+
+def tokenize(text):
+    """Lowercase and split text into words, dropping surrounding punctuation"""
+    return [w.strip(STRIP_CHARS) for w in text.lower().split()]
+
+
+class Lexicon:
+    """Precompiled weighted sentiment lexicon with phrase and negation handling"""
+
+    def __init__(self, weights, negations=NEGATION_WORDS, negation_window=3):
+        self.words = {}
+        self.phrases = {}
+        for term, weight in weights.items():
+            tokens = tuple(t for t in tokenize(term) if t)
+            if len(tokens) == 1:
+                self.words[tokens[0]] = weight
+            elif tokens:
+                self.phrases[tokens] = weight
+        self.phrase_starts = frozenset(p[0] for p in self.phrases)
+        self.max_phrase_len = max((len(p) for p in self.phrases), default=1)
+        self.negations = frozenset(negations)
+        self.negation_window = negation_window
+        self.triggers = frozenset(self.words) | self.phrase_starts
+        self.interesting = self.triggers | self.negations
+
+    @classmethod
+    def default(cls):
+        """Build the built-in lexicon (every word weighs 1)"""
+        weights = {word: 1 for word in POSITIVE_WORDS}
+        weights.update({word: -1 for word in NEGATIVE_WORDS})
+        return cls(weights)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load a lexicon file with one "term weight" entry per line"""
+        weights = {}
+        with open(path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    term, weight = line.rsplit(None, 1)
+                    weights[term] = int(weight) if weight.lstrip('+-').isdigit() else float(weight)
+                except ValueError:
+                    raise ValueError(f"{path}:{line_no}: expected 'term weight', got {line!r}")
+        return cls(weights, **kwargs)
+
+    def score_tokens(self, tokens, raw=None):
+        """Return the signed sentiment total for tokenized text"""
+        if self.triggers.isdisjoint(tokens):
+            return 0
+        words, phrases, phrase_starts = self.words, self.phrases, self.phrase_starts
+        interesting = self.interesting
+        total = 0
+        negated_until = skip_until = -1
+        for i, token in enumerate(tokens):
+            if token not in interesting or i < skip_until:
+                if raw is not None and i < negated_until and raw[i][-1:] in CLAUSE_BREAKS:
+                    negated_until = -1
+                continue
+            weight = None
+            if token in phrase_starts:
+                for size in range(min(self.max_phrase_len, len(tokens) - i), 1, -1):
+                    weight = phrases.get(tuple(tokens[i:i + size]))
+                    if weight is not None:
+                        skip_until = i + size
+                        break
+            if weight is None:
+                weight = words.get(token)
+            if weight is not None:
+                total += -weight if i < negated_until else weight
+            elif token in self.negations:
+                negated_until = i + 1 + self.negation_window
+            if raw is not None and raw[i][-1:] in CLAUSE_BREAKS:
+                negated_until = -1
+        return total
+
+    def score(self, text):
+        """Return the signed sentiment total for a text"""
+        raw = text.lower().split()
+        return self.score_tokens([w.strip(STRIP_CHARS) for w in raw], raw)
+
+
+DEFAULT_LEXICON = Lexicon.default()
+
+
 class ContentAnalyzer:
     """Analyzes text content for insights and metrics"""
     
-    def __init__(self):
+    def __init__(self, lexicon=None):
         self.stop_words = {'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'and', 'or', 'but', 'is', 'are', 'was', 'were'}
+        self.lexicon = lexicon or DEFAULT_LEXICON
     
     def analyze_sentiment(self, text):
-        """Analyze sentiment using keyword matching"""
-        positive_words = ['great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'best', 'awesome', 'good', 'happy']
-        negative_words = ['bad', 'terrible', 'awful', 'hate', 'worst', 'poor', 'disappointing', 'sad', 'angry']
-        
-        text_lower = text.lower()
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
-        
-        if pos_count > neg_count:
-            return "Positive", pos_count - neg_count
-        elif neg_count > pos_count:
-            return "Negative", neg_count - pos_count
+        """Analyze sentiment by scoring whole tokens against the lexicon"""
+        return self._label(self.lexicon.score(text))
+    
+    @staticmethod
+    def _label(total):
+        if total > 0:
+            return "Positive", total
+        elif total < 0:
+            return "Negative", -total
         else:
             return "Neutral", 0
     
     def extract_keywords(self, text, top_n=5):
         """Extract top keywords from text"""
         # Remove punctuation and convert to lowercase
-        words = re.findall(r'\b\w+\b', text.lower())
+        words = KEYWORD_RE.findall(text.lower())
         # Filter out stop words
         filtered_words = [w for w in words if w not in self.stop_words and len(w) > 3]
         # Count word frequency
@@ -53,64 +162,297 @@ class ContentAnalyzer:
         if len(sentences) == 0 or len(words) == 0:
             return 0
         
-        avg_words_per_sentence = len(words) / len(sentences)
-        avg_word_length = sum(len(word) for word in words) / len(words)
+        return self._readability(len(sentences), len(words), sum(len(word) for word in words))
+    
+    @staticmethod
+    def _readability(sentence_count, word_count, letter_count):
+        avg_words_per_sentence = word_count / sentence_count
+        avg_word_length = letter_count / word_count
         
         # Simple readability score
         score = 100 - (avg_words_per_sentence * 2) - (avg_word_length * 5)
         return max(0, min(100, score))
+    
+    def analyze_text(self, text, top_n=5):
+        """Return (sentiment, score, keywords, readability) from one pass over the text"""
+        lower = text.lower()
+        raw = lower.split()
+        sentiment, score = self._label(self.lexicon.score_tokens([w.strip(STRIP_CHARS) for w in raw], raw))
+        counts = Counter([w for w in KEYWORD_RE.findall(lower) if len(w) > 3 and w not in self.stop_words])
+        # same ordering as Counter.most_common, minus its heapq overhead on tiny inputs
+        keywords = sorted(counts.items(), key=itemgetter(1), reverse=True)[:top_n]
+        readability = self._readability(text.count('.') + 1, len(raw), sum(map(len, raw))) if raw else 0
+        return sentiment, score, keywords, readability
+
+def _open_binary(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def iter_post_records(path, start_offset=0, start_record=0):
+    """Yield (record, offset) pairs from an NDJSON or CSV posts file (optionally .gz)"""
+    name = path[:-3] if path.endswith('.gz') else path
+    with _open_binary(path) as f:
+        if name.endswith('.csv'):
+            reader = csv.DictReader(io.TextIOWrapper(f, encoding='utf-8', newline=''))
+            for record in islice(reader, start_record, None):
+                yield record, None
+            return
+        f.seek(start_offset)
+        offset = start_offset
+        for line in f:
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line), offset
+            except ValueError:
+                yield None, offset
+
+
+def _read_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_checkpoint(path, state):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+_worker_analyzer = None
+
+
+def _init_worker(lexicon, stop_words):
+    """Process-pool initializer: build the analyzer once per worker"""
+    global _worker_analyzer
+    _worker_analyzer = ContentAnalyzer(lexicon)
+    _worker_analyzer.stop_words = stop_words
+
+
+def _analyze_texts(texts):
+    return [_worker_analyzer.analyze_text(text) for text in texts]
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+UTC_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S%z"
+
+
+def _parse_timestamp(value, utc=False):
+    """Epoch seconds from a timestamp string (or a number); naive strings are local time unless utc"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    value = value.strip()
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        parsed = datetime.strptime(value, UTC_TIMESTAMP_FORMAT)
+    if parsed.tzinfo is None and utc:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+class Engagement(MutableMapping):
+    """Dict-like view of a post's likes/shares/comments that notifies its listener"""
+    
+    __slots__ = ('post',)
+    KEYS = ('likes', 'shares', 'comments')
+    
+    def __init__(self, post):
+        self.post = post
+    
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self.post, key)
+    
+    def __setitem__(self, key, value):
+        self.post.add_engagement(**{key: value - self[key]})
+    
+    def __delitem__(self, key):
+        raise TypeError("engagement fields cannot be deleted")
+    
+    def __iter__(self):
+        return iter(self.KEYS)
+    
+    def __len__(self):
+        return len(self.KEYS)
+    
+    def __repr__(self):
+        return repr(dict(self))
+
 
 class SocialMediaPost:
-    """Represents a social media post"""
+    """Represents a social media post (slotted; timestamp and engagement are views over its fields)"""
+    
+    __slots__ = ('platform', 'content', 'author', 'hashtags', 'created', 'raw_timestamp',
+                 'likes', 'shares', 'comments', 'analysis', 'listener')
     
-    def __init__(self, platform, content, author, hashtags=None):
-        self.platform = platform
+    def __init__(self, platform, content, author, hashtags=None, created=None):
+        self.platform = sys.intern(platform)
         self.content = content
-        self.author = author
-        self.hashtags = hashtags if hashtags else []
-        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.engagement = {'likes': 0, 'shares': 0, 'comments': 0}
+        self.author = sys.intern(author)
+        self.hashtags = tuple(hashtags) if hashtags else ()
+        self.created = int(time.time()) if created is None else created
+        self.raw_timestamp = None  # an unparseable timestamp string, kept verbatim (created is None)
+        self.likes = self.shares = self.comments = 0
+        self.analysis = None  # (content, ContentAnalyzer.analyze_text result), filled lazily
+        self.listener = None  # called as listener(post, delta) when engagement changes
+    
+    @property
+    def timestamp(self):
+        return self.format_timestamp()
+    
+    @timestamp.setter
+    def timestamp(self, value):
+        self.set_timestamp(value)
+    
+    def format_timestamp(self, utc=False):
+        """Local TIMESTAMP_FORMAT string, or UTC with an explicit offset if utc"""
+        if self.created is None:
+            return self.raw_timestamp
+        if utc:
+            return datetime.fromtimestamp(self.created, timezone.utc).strftime(UTC_TIMESTAMP_FORMAT)
+        return datetime.fromtimestamp(self.created).strftime(TIMESTAMP_FORMAT)
+    
+    def set_timestamp(self, value, utc=False):
+        """Parse a timestamp string, reading naive ones as UTC if utc"""
+        try:
+            self.created, self.raw_timestamp = _parse_timestamp(value, utc), None
+        except (TypeError, ValueError):
+            self.created, self.raw_timestamp = None, value
+    
+    @property
+    def engagement(self):
+        return Engagement(self)
+    
+    @engagement.setter
+    def engagement(self, value):
+        self.add_engagement(**{key: int(value.get(key) or 0) - getattr(self, key) for key in Engagement.KEYS})
+    
+    @classmethod
+    def from_dict(cls, data, utc=False):
+        """Build a post from a to_dict()-style record or a flat CSV row"""
+        hashtags = data.get('hashtags') or []
+        if isinstance(hashtags, str):
+            hashtags = hashtags.replace(',', ' ').split()
+        post = cls(data['platform'], data['content'], data['author'], hashtags)
+        if data.get('timestamp'):
+            post.set_timestamp(data['timestamp'], utc)
+        engagement = data.get('engagement') or data
+        post.add_engagement(**{k: int(engagement.get(k) or 0) for k in ('likes', 'shares', 'comments')})
+        return post
     
     def add_engagement(self, likes=0, shares=0, comments=0):
         """Add engagement metrics"""
-        self.engagement['likes'] += likes
-        self.engagement['shares'] += shares
-        self.engagement['comments'] += comments
+        self.likes += likes
+        self.shares += shares
+        self.comments += comments
+        if self.listener is not None:
+            self.listener(self, likes + shares + comments)
     
     def get_engagement_rate(self):
         """Calculate total engagement"""
-        return sum(self.engagement.values())
+        return self.likes + self.shares + self.comments
     
-    def to_dict(self):
-        """Convert post to dictionary"""
+    def to_dict(self, utc=False):
+        """Convert post to dictionary (utc=True writes UTC timestamps with an offset)"""
         return {
             'platform': self.platform,
             'content': self.content,
             'author': self.author,
-            'hashtags': self.hashtags,
-            'timestamp': self.timestamp,
-            'engagement': self.engagement
+            'hashtags': list(self.hashtags),
+            'timestamp': self.format_timestamp(utc),
+            'engagement': dict(self.engagement)
         }
 
 class SocialMediaManager:
     """Manages social media posts and analytics"""
     
-    def __init__(self):
+    def __init__(self, quiet=False):
         self.posts = []
         self.analyzer = ContentAnalyzer()
+        self.quiet = quiet
+        # Aggregates kept up to date as posts are added or gain engagement,
+        # so reports never rescan self.posts.
+        self.total_engagement = 0
+        self._platform_stats = {}
+        self._unscored = {}      # id(post) -> post whose sentiment is not in the histograms yet
+        self._top_heap = []      # [-engagement, seq, tick, post]; post is None once stale
+        self._top_entries = {}   # id(post) -> its live heap entry
+        self._seq = count()
     
     def create_post(self, platform, content, author, hashtags=None):
         """Create a new social media post"""
-        post = SocialMediaPost(platform, content, author, hashtags)
+        post = self.add_post(SocialMediaPost(platform, content, author, hashtags))
+        if not self.quiet:
+            print(f"✅ Post created on {platform} by {author}")
+        return post
+    
+    def add_post(self, post):
+        """Track an existing post in the aggregates (adding it twice is a no-op)"""
+        if id(post) in self._top_entries:
+            return post
+        if post.listener is not None:
+            raise ValueError("post is already tracked by another manager")
         self.posts.append(post)
-        print(f"✅ Post created on {platform} by {author}")
+        engagement = post.get_engagement_rate()
+        stats = self._platform_stats.get(post.platform)
+        if stats is None:
+            stats = self._platform_stats[post.platform] = {'total_posts': 0, 'total_engagement': 0,
+                                                           'sentiment_counts': Counter()}
+        stats['total_posts'] += 1
+        stats['total_engagement'] += engagement
+        self.total_engagement += engagement
+        self._unscored[id(post)] = post
+        seq = next(self._seq)
+        entry = [-engagement, seq, seq, post]
+        self._top_entries[id(post)] = entry
+        heapq.heappush(self._top_heap, entry)
+        post.listener = self._on_engagement
         return post
     
+    def _on_engagement(self, post, delta):
+        self._platform_stats[post.platform]['total_engagement'] += delta
+        self.total_engagement += delta
+        # lazy deletion: retire the old heap entry and push a fresh one with
+        # the same sequence number, so ties keep creation order (the tick
+        # keeps old and new entries of one post comparable)
+        old = self._top_entries[id(post)]
+        old[3] = None
+        entry = [-post.get_engagement_rate(), old[1], next(self._seq), post]
+        self._top_entries[id(post)] = entry
+        heapq.heappush(self._top_heap, entry)
+        if len(self._top_heap) > 2 * len(self._top_entries) + 64:
+            self._top_heap = [e for e in self._top_heap if e[3] is not None]
+            heapq.heapify(self._top_heap)
+    
+    def content_analysis(self, post):
+        """Return the memoized content analysis for a post, computing it on first use"""
+        if post.analysis is None or post.analysis[0] != post.content:
+            self._store_analysis(post, self.analyzer.analyze_text(post.content))
+        return post.analysis[1]
+    
+    def _store_analysis(self, post, result):
+        # a tracked post already counted in the histograms moves its count
+        # from the old sentiment to the new one when its content is re-analyzed
+        old, post.analysis = post.analysis, (post.content, result)
+        key = id(post)
+        if old is not None and key in self._top_entries and key not in self._unscored:
+            counts = self._platform_stats[post.platform]['sentiment_counts']
+            counts[old[1][0]] -= 1
+            if not counts[old[1][0]]:
+                del counts[old[1][0]]
+            counts[result[0]] += 1
+    
     def analyze_post(self, post):
         """Analyze a post for insights"""
-        sentiment, score = self.analyzer.analyze_sentiment(post.content)
-        keywords = self.analyzer.extract_keywords(post.content)
-        readability = self.analyzer.calculate_readability(post.content)
+        sentiment, score, keywords, readability = self.content_analysis(post)
         
         analysis = {
             'platform': post.platform,
@@ -126,29 +468,136 @@ class SocialMediaManager:
         
         return analysis
     
+    def analyze_corpus(self, posts=None, workers=None, chunk_size=2000, pool=None):
+        """Analyze many posts at once and return a columnar summary"""
+        posts = self.posts if posts is None else posts
+        workers = os.cpu_count() if workers is None else workers
+        pending = list({post.content: None for post in posts
+                        if post.analysis is None or post.analysis[0] != post.content})
+        
+        if pending:
+            if pool is not None or (workers > 1 and len(pending) > chunk_size):
+                chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+                if pool is not None:
+                    results = [r for chunk in pool.map(_analyze_texts, chunks) for r in chunk]
+                else:
+                    with self._worker_pool(workers) as own_pool:
+                        results = [r for chunk in own_pool.map(_analyze_texts, chunks) for r in chunk]
+            else:
+                results = [self.analyzer.analyze_text(text) for text in pending]
+            fresh = dict(zip(pending, results))
+            for post in posts:
+                if post.content in fresh and (post.analysis is None or post.analysis[0] != post.content):
+                    self._store_analysis(post, fresh[post.content])
+        
+        columns = {name: [] for name in ('platform', 'author', 'sentiment', 'sentiment_score', 'top_keywords',
+                                         'readability_score', 'character_count', 'hashtag_count', 'engagement_rate')}
+        for post in posts:
+            sentiment, score, keywords, readability = post.analysis[1]
+            columns['platform'].append(post.platform)
+            columns['author'].append(post.author)
+            columns['sentiment'].append(sentiment)
+            columns['sentiment_score'].append(score)
+            columns['top_keywords'].append(keywords)
+            columns['readability_score'].append(round(readability, 2))
+            columns['character_count'].append(len(post.content))
+            columns['hashtag_count'].append(len(post.hashtags))
+            columns['engagement_rate'].append(post.get_engagement_rate())
+        return columns
+    
+    def _worker_pool(self, workers):
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(self.analyzer.lexicon, self.analyzer.stop_words))
+    
+    def ingest_file(self, path, output, chunk_size=10000, workers=1, checkpoint=None, resume=True, utc=False):
+        """Stream posts from an NDJSON or CSV file into an analyzed NDJSON file, with checkpoints"""
+        checkpoint = checkpoint or output + '.checkpoint.json'
+        state = _read_checkpoint(checkpoint) if resume else None
+        if state and state.get('input') != os.path.abspath(path):
+            state = None
+        state = state or {'input': os.path.abspath(path), 'records': 0, 'input_offset': 0, 'output_offset': 0, 'errors': 0, 'sentiment': {}}
+        if state['records'] and not self.quiet:
+            print(f"↩️  Resuming {path} at record {state['records']:,}", file=sys.stderr)
+        
+        start = time.perf_counter()
+        sentiments = Counter(state['sentiment'])
+        pool = self._worker_pool(workers) if workers > 1 else None
+        try:
+            with open(output, 'ab' if state['output_offset'] else 'wb') as out:
+                out.truncate(state['output_offset'])
+                chunk, offset = [], state['input_offset']
+                for record, offset in iter_post_records(path, state['input_offset'], state['records']):
+                    try:
+                        chunk.append(SocialMediaPost.from_dict(record, utc))
+                    except (KeyError, TypeError, ValueError, AttributeError):
+                        state['errors'] += 1
+                        state['records'] += 1
+                        continue
+                    if len(chunk) >= chunk_size:
+                        self._write_chunk(chunk, out, state, offset, sentiments, workers, pool, utc)
+                        _write_checkpoint(checkpoint, state)
+                        chunk = []
+                        if not self.quiet:
+                            print(f"   {state['records']:,} posts ingested", file=sys.stderr)
+                if chunk:
+                    self._write_chunk(chunk, out, state, offset, sentiments, workers, pool, utc)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        
+        stats = {'records': state['records'], 'errors': state['errors'], 'sentiment': state['sentiment'],
+                 'seconds': round(time.perf_counter() - start, 2)}
+        if not self.quiet:
+            print(f"\n💾 Analyzed {stats['records']:,} posts into {output} in {stats['seconds']}s")
+        return stats
+    
+    def _write_chunk(self, chunk, out, state, offset, sentiments, workers, pool, utc=False):
+        columns = self.analyze_corpus(chunk, workers=workers, pool=pool)
+        lines = []
+        for i, post in enumerate(chunk):
+            record = post.to_dict(utc)
+            record['analysis'] = {
+                'sentiment': columns['sentiment'][i],
+                'sentiment_score': columns['sentiment_score'][i],
+                'top_keywords': columns['top_keywords'][i],
+                'readability_score': columns['readability_score'][i],
+            }
+            lines.append(json.dumps(record, ensure_ascii=False))
+        sentiments.update(columns['sentiment'])
+        state['sentiment'] = dict(sentiments)
+        out.write(('\n'.join(lines) + '\n').encode('utf-8'))
+        out.flush()
+        state['records'] += len(chunk)
+        state['input_offset'] = offset
+        state['output_offset'] = out.tell()
+    
     def get_top_posts(self, n=5):
-        """Get top N posts by engagement"""
-        sorted_posts = sorted(self.posts, key=lambda p: p.get_engagement_rate(), reverse=True)
-        return sorted_posts[:n]
+        """Get top N posts by engagement (ties in creation order), in O(n log N)"""
+        heap = self._top_heap
+        top = []
+        while heap and len(top) < n:
+            entry = heapq.heappop(heap)
+            if entry[3] is not None:
+                top.append(entry)
+        for entry in top:
+            heapq.heappush(heap, entry)
+        return [entry[3] for entry in top]
     
     def get_platform_stats(self):
         """Get statistics by platform"""
-        platform_stats = {}
+        if self._unscored:
+            pending = list(self._unscored.values())
+            columns = self.analyze_corpus(pending, workers=1)
+            self._unscored = {}
+            for platform, sentiment in zip(columns['platform'], columns['sentiment']):
+                self._platform_stats[platform]['sentiment_counts'][sentiment] += 1
         
-        for post in self.posts:
-            if post.platform not in platform_stats:
-                platform_stats[post.platform] = {
-                    'total_posts': 0,
-                    'total_engagement': 0,
-                    'sentiments': []
-                }
-            
-            platform_stats[post.platform]['total_posts'] += 1
-            platform_stats[post.platform]['total_engagement'] += post.get_engagement_rate()
-            sentiment, _ = self.analyzer.analyze_sentiment(post.content)
-            platform_stats[post.platform]['sentiments'].append(sentiment)
-        
-        return platform_stats
+        return {platform: {'total_posts': stats['total_posts'],
+                           'total_engagement': stats['total_engagement'],
+                           'sentiment_counts': dict(stats['sentiment_counts'])}
+                for platform, stats in self._platform_stats.items()}
     
     def generate_report(self):
         """Generate comprehensive analytics report"""
@@ -158,7 +607,7 @@ class SocialMediaManager:
         
         # Overall statistics
         total_posts = len(self.posts)
-        total_engagement = sum(post.get_engagement_rate() for post in self.posts)
+        total_engagement = self.total_engagement
         
         print(f"\n📈 Overall Statistics:")
         print(f"   Total Posts: {total_posts}")
@@ -172,8 +621,7 @@ class SocialMediaManager:
             print(f"\n   {platform}:")
             print(f"      Posts: {stats['total_posts']}")
             print(f"      Total Engagement: {stats['total_engagement']}")
-            sentiment_counts = Counter(stats['sentiments'])
-            print(f"      Sentiment: {dict(sentiment_counts)}")
+            print(f"      Sentiment: {stats['sentiment_counts']}")
         
         # Top performing posts
         print(f"\n🏆 Top 3 Posts by Engagement:")
@@ -186,12 +634,16 @@ class SocialMediaManager:
         
         print("\n" + "="*60)
     
-    def save_to_file(self, filename='social_media_data.json'):
-        """Save posts to JSON file"""
-        data = [post.to_dict() for post in self.posts]
+    def save_to_file(self, filename='social_media_data.json', ndjson=False):
+        """Save posts to JSON file (or NDJSON, one post per line, written as it goes)"""
         with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"\n💾 Data saved to {filename}")
+            if ndjson:
+                for post in self.posts:
+                    f.write(json.dumps(post.to_dict(), ensure_ascii=False) + '\n')
+            else:
+                json.dump([post.to_dict() for post in self.posts], f, indent=2)
+        if not self.quiet:
+            print(f"\n💾 Data saved to {filename}")
 
 def demo_usage():
     """Demonstrate the Social Media Manager"""
@@ -251,14 +703,15 @@ def demo_usage():
             data['hashtags']
         )
         post.add_engagement(**data['engagement'])
-        
-        # Analyze individual post
-        analysis = manager.analyze_post(post)
-        print(f"\n   Analysis for {data['author']}'s post:")
-        print(f"   - Sentiment: {analysis['sentiment']} (score: {analysis['sentiment_score']})")
-        print(f"   - Top Keywords: {', '.join([w[0] for w in analysis['top_keywords'][:3]])}")
-        print(f"   - Readability Score: {analysis['readability_score']}/100")
-        print(f"   - Engagement Rate: {analysis['engagement_rate']}")
+    
+    # Analyze all posts in one batch
+    summary = manager.analyze_corpus(workers=1)
+    for i, author in enumerate(summary['author']):
+        print(f"\n   Analysis for {author}'s post:")
+        print(f"   - Sentiment: {summary['sentiment'][i]} (score: {summary['sentiment_score'][i]})")
+        print(f"   - Top Keywords: {', '.join([w[0] for w in summary['top_keywords'][i][:3]])}")
+        print(f"   - Readability Score: {summary['readability_score'][i]}/100")
+        print(f"   - Engagement Rate: {summary['engagement_rate'][i]}")
     
     # Generate comprehensive report
     manager.generate_report()
@@ -268,6 +721,97 @@ def demo_usage():
     
     print("\n✨ Demo completed successfully!")
 
+def benchmark_sentiment(n_docs=1_000_000, lexicon=None):
+    """Score a synthetic corpus and report documents per second"""
+    samples = [
+        'Just launched our amazing new AI product! This is going to revolutionize the industry.',
+        'Disappointed with the latest update. Many bugs and poor performance. Hope this gets fixed soon.',
+        'Not bad at all, the new dashboard is good but the docs are awful.',
+        'Goodbye to the old release, it was never great and the support was sad.',
+        'Excellent webinar on AWS cloud services and best practices. Learned so much!',
+    ]
+    analyzer = ContentAnalyzer(lexicon)
+    counts = Counter()
+    start = time.perf_counter()
+    for text in islice(cycle(samples), n_docs):
+        counts[analyzer.analyze_sentiment(text)[0]] += 1
+    elapsed = time.perf_counter() - start
+    print(f"Scored {n_docs:,} posts in {elapsed:.2f}s ({n_docs / elapsed:,.0f} docs/sec)")
+    print(f"Sentiment: {dict(counts)}")
+    return n_docs / elapsed
+
+def benchmark_post_storage(n_posts=200_000):
+    """Report bytes per post for the old dict-based layout and slotted posts"""
+    import tracemalloc
+    
+    class DictPost:
+        # the pre-slots layout: instance __dict__, engagement dict, strftime string
+        def __init__(self, platform, content, author, hashtags):
+            self.platform = platform
+            self.content = content
+            self.author = author
+            self.hashtags = hashtags
+            self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.engagement = {'likes': 0, 'shares': 0, 'comments': 0}
+    
+    platforms = ['Twitter', 'LinkedIn', 'Instagram']
+    # contents are shared across layouts and excluded, so only per-post overhead is measured;
+    # platform names are rebuilt per post, as a parser would produce them
+    contents = [f'Post number {i} about cloud computing' for i in range(n_posts)]
+    
+    def measure(build):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del kept
+        return used / n_posts
+    
+    def dict_posts():
+        posts = []
+        for i, content in enumerate(contents):
+            post = DictPost(''.join(platforms[i % 3]), content, 'author%d' % (i % 1000), ['#AI'])
+            post.engagement['likes'] += i % 50
+            posts.append(post)
+        return posts
+    
+    def slotted_posts():
+        posts = []
+        for i, content in enumerate(contents):
+            post = SocialMediaPost(''.join(platforms[i % 3]), content, 'author%d' % (i % 1000), ['#AI'])
+            post.add_engagement(likes=i % 50)
+            posts.append(post)
+        return posts
+    
+    results = {}
+    for name, build in (('dict posts', dict_posts), ('slotted posts', slotted_posts)):
+        results[name] = measure(build)
+        print(f"{name:>14}: {results[name]:7.1f} bytes/post")
+    return results
+
 # Run the demonstration
 if __name__ == "__main__":
-    demo_usage()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        benchmark_sentiment(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'bench-storage':
+        benchmark_post_storage(int(sys.argv[2]) if len(sys.argv) > 2 else 200_000)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'ingest':
+        import argparse
+        parser = argparse.ArgumentParser(prog='social_media_analyzer.py ingest',
+                                         description='Analyze an NDJSON/CSV (.gz) posts file into NDJSON')
+        parser.add_argument('input')
+        parser.add_argument('output')
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--no-resume', action='store_true', help='Ignore any existing checkpoint')
+        parser.add_argument('--quiet', action='store_true', help='Only print the final summary')
+        parser.add_argument('--utc', action='store_true',
+                            help='Read naive timestamps as UTC and write UTC timestamps with an offset')
+        args = parser.parse_args(sys.argv[2:])
+        stats = SocialMediaManager(quiet=args.quiet).ingest_file(
+            args.input, args.output, chunk_size=args.chunk_size, workers=args.workers, resume=not args.no_resume,
+            utc=args.utc)
+        print(json.dumps(stats))
+    else:
+        demo_usage()
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""Stubbed-client tests for aws.py
+
+Run with: python -m unittest test_aws
+"""
+
+import unittest
+
+import boto3
+from botocore.stub import Stubber
+
+import aws
+
+REVISION = {"revisionType": "S3", "s3Location": {"bucket": "releases", "key": "app.zip", "bundleType": "ZIP"}}
+
+
+class RolloutCodeDeployTestCase(unittest.TestCase):
+        def setUp(self):
+                self.client = boto3.client("codedeploy", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test")
+                self.stub = Stubber(self.client)
+                self.stub.activate()
+                self.events = []
+
+        def tearDown(self):
+                self.stub.deactivate()
+
+        def expect_create(self, group, deployment_id):
+                self.stub.add_response(
+                        "create_deployment",
+                        {"deploymentId": deployment_id},
+                        {"applicationName": "app", "deploymentGroupName": group, "revision": REVISION, "ignoreApplicationStopFailures": True},
+                )
+
+        def expect_poll(self, statuses):
+                self.stub.add_response(
+                        "batch_get_deployments",
+                        {"deploymentsInfo": [{"deploymentId": d, "status": st} for d, st in statuses]},
+                        {"deploymentIds": [d for d, _ in statuses]},
+                )
+
+        def rollout(self, groups, **kwargs):
+                return aws.rollout_codedeploy("app", groups, "releases", "app.zip", min_poll=0, max_poll=0, on_event=self.events.append, client=self.client, **kwargs)
+
+        def test_waves_start_only_after_previous_wave_settles(self):
+                # Stubber enforces call order: g3 may only be created after wave 1 is polled to completion
+                self.expect_create("g1", "d-1")
+                self.expect_create("g2", "d-2")
+                self.expect_poll([("d-1", "InProgress"), ("d-2", "Succeeded")])
+                self.expect_poll([("d-1", "Succeeded")])
+                self.expect_create("g3", "d-3")
+                self.expect_poll([("d-3", "Succeeded")])
+
+                result = self.rollout(["g1", "g2", "g3"], wave_size=2)
+
+                self.stub.assert_no_pending_responses()
+                self.assertEqual(sorted(result["succeeded"]), ["g1", "g2", "g3"])
+                self.assertEqual(result["failed"], [])
+                self.assertEqual(result["not_started"], [])
+                self.assertFalse(result["aborted"])
+                self.assertEqual(
+                        [(e["wave"], e["group"], e["status"]) for e in self.events],
+                        [(1, "g1", "Created"), (1, "g2", "Created"), (1, "g1", "InProgress"), (1, "g2", "Succeeded"), (1, "g1", "Succeeded"), (2, "g3", "Created"), (2, "g3", "Succeeded")],
+                )
+
+        def test_failure_threshold_aborts_remaining_waves(self):
+                self.expect_create("g1", "d-1")
+                self.expect_create("g2", "d-2")
+                self.expect_poll([("d-1", "Failed"), ("d-2", "InProgress")])
+
+                result = self.rollout(["g1", "g2", "g3", "g4"], wave_size=2, max_failures=0)
+
+                self.stub.assert_no_pending_responses()
+                self.assertTrue(result["aborted"])
+                self.assertEqual(result["failed"], ["g1"])
+                self.assertEqual(result["in_progress"], ["g2"])
+                self.assertEqual(result["not_started"], ["g3", "g4"])
+
+        def test_create_failures_count_towards_threshold(self):
+                self.stub.add_client_error("create_deployment", service_error_code="DeploymentLimitExceededException")
+                self.expect_create("g2", "d-2")
+                self.expect_poll([("d-2", "Succeeded")])
+                # the second failure crosses max_failures=1, so g4 is never created
+                self.stub.add_client_error("create_deployment", service_error_code="DeploymentLimitExceededException")
+
+                result = self.rollout(["g1", "g2", "g3", "g4"], wave_size=2, max_failures=1)
+
+                self.stub.assert_no_pending_responses()
+                self.assertTrue(result["aborted"])
+                self.assertEqual(result["failed"], ["g1", "g3"])
+                self.assertEqual(result["succeeded"], ["g2"])
+                self.assertEqual(result["not_started"], ["g4"])
+
+        def test_wave_size_must_be_positive(self):
+                with self.assertRaises(ValueError):
+                        self.rollout(["g1"], wave_size=0)
+
+
+if __name__ == "__main__":
+        unittest.main()
@@ -0,0 +1,126 @@
+"""Stubbed-EC2 tests for the bulk EC2Manager operations documented in .py
+
+The project modules (config.py, utils.py, ec2_manager.py) live as sections
+of the .py write-up, so they are loaded from there into throwaway modules.
+
+Run with: python -m unittest test_ec2_manager
+"""
+
+import os
+import re
+import sys
+import types
+import unittest
+
+from botocore.stub import Stubber
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.py')
+
+
+def load_section(name):
+    """Exec the '### N. <name>.py' section of .py as module <name>"""
+    with open(SOURCE, encoding='utf-8') as f:
+        text = f.read()
+    marks = [(m.start(), m.group(1)) for m in re.finditer(r'^#* *### \d+\. (\w+)\.py', text, re.M)]
+    for i, (start, section) in enumerate(marks):
+        if section == name:
+            end = marks[i + 1][0] if i + 1 < len(marks) else len(text)
+            module = types.ModuleType(name)
+            module.__file__ = SOURCE
+            sys.modules[name] = module
+            exec(compile(text[start:end], SOURCE, 'exec'), module.__dict__)
+            return module
+    raise ImportError(f"No section for {name}.py in {SOURCE}")
+
+
+load_section('config')
+load_section('utils')
+ec2_manager = load_section('ec2_manager')
+
+
+def reservations(*instances):
+    return {'Reservations': [{'Instances': [
+        {'InstanceId': instance_id, 'State': {'Name': state}} for instance_id, state in instances
+    ]}]}
+
+
+class EC2ManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = ec2_manager.EC2Manager()
+        self.stub = Stubber(self.manager.ec2_client)
+        self.stub.activate()
+
+    def tearDown(self):
+        self.stub.deactivate()
+
+    def test_stop_by_tag_only_selects_stoppable_states(self):
+        self.stub.add_response('describe_instances', reservations(('i-1', 'running'), ('i-2', 'pending')), {
+            'Filters': [
+                {'Name': 'tag:team', 'Values': ['payments']},
+                {'Name': 'instance-state-name', 'Values': ['pending', 'running']},
+            ],
+        })
+        self.stub.add_response('stop_instances', {}, {'InstanceIds': ['i-1', 'i-2']})
+
+        result = self.manager.stop_instances(tags={'team': 'payments'}, wait=False)
+
+        self.assertEqual(result, {'i-1': None, 'i-2': None})
+        self.stub.assert_no_pending_responses()
+
+    def test_start_by_id_skips_instances_in_other_states(self):
+        self.stub.add_response('describe_instances',
+                               reservations(('i-1', 'stopped'), ('i-2', 'running'), ('i-3', 'terminated')),
+                               {'InstanceIds': ['i-1', 'i-2', 'i-3']})
+        self.stub.add_response('start_instances', {}, {'InstanceIds': ['i-1']})
+
+        result = self.manager.start_instances(['i-1', 'i-2', 'i-3'], wait=False)
+
+        self.assertEqual(result, {'i-1': None})
+        self.stub.assert_no_pending_responses()
+
+    def test_terminate_by_tag_excludes_terminated(self):
+        self.stub.add_response('describe_instances', reservations(('i-1', 'stopped')), {
+            'Filters': [
+                {'Name': 'tag:env', 'Values': ['dev']},
+                {'Name': 'instance-state-name',
+                 'Values': ['pending', 'running', 'shutting-down', 'stopping', 'stopped']},
+            ],
+        })
+        self.stub.add_response('terminate_instances', {}, {'InstanceIds': ['i-1']})
+
+        self.manager.terminate_instances(tags={'env': 'dev'}, wait=False)
+        self.stub.assert_no_pending_responses()
+
+    def test_wait_drops_instances_that_no_longer_exist(self):
+        self.stub.add_client_error('describe_instances', service_error_code='InvalidInstanceID.NotFound',
+                                   service_message="The instance ID 'i-2' does not exist",
+                                   expected_params={'InstanceIds': ['i-1', 'i-2']})
+        self.stub.add_response('describe_instances', reservations(('i-1', 'stopped')), {'InstanceIds': ['i-1']})
+
+        states = self.manager.wait_for_state(['i-1', 'i-2'], 'stopped', poll_seconds=0.001)
+
+        self.assertEqual(states, {'i-1': 'stopped', 'i-2': 'not-found'})
+        self.stub.assert_no_pending_responses()
+
+    def test_wait_for_running_gives_up_when_instance_falls_back_to_stopped(self):
+        self.stub.add_response('describe_instances', reservations(('i-1', 'stopped')), {'InstanceIds': ['i-1']})
+        self.stub.add_response('describe_instances', reservations(('i-1', 'stopped')), {'InstanceIds': ['i-1']})
+
+        states = self.manager.wait_for_state(['i-1'], 'running', timeout=60, poll_seconds=0.001)
+
+        self.assertEqual(states, {'i-1': 'stopped'})
+        self.stub.assert_no_pending_responses()
+
+    def test_wait_for_stopped_treats_shutting_down_as_dead_end(self):
+        self.stub.add_response('describe_instances', reservations(('i-1', 'stopping'), ('i-2', 'shutting-down')),
+                               {'InstanceIds': ['i-1', 'i-2']})
+        self.stub.add_response('describe_instances', reservations(('i-1', 'stopped')), {'InstanceIds': ['i-1']})
+
+        states = self.manager.wait_for_state(['i-1', 'i-2'], 'stopped', poll_seconds=0.001)
+
+        self.assertEqual(states, {'i-1': 'stopped', 'i-2': 'shutting-down'})
+        self.stub.assert_no_pending_responses()
+
+
+if __name__ == '__main__':
+    unittest.main()
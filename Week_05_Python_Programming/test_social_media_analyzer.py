@@ -0,0 +1,138 @@
+"""Tests for the incremental aggregates kept by SocialMediaManager
+
+Run with: python -m unittest test_social_media_analyzer
+"""
+
+import random
+import unittest
+from collections import Counter
+from datetime import datetime
+
+from social_media_analyzer import SocialMediaManager, SocialMediaPost
+
+TEXTS = [
+    'Amazing launch, we love it!',
+    'Terrible update, many bugs and poor support.',
+    'Notes from the meeting on cloud computing.',
+    'Not bad at all, the dashboard is good.',
+    'Never great, always sad.',
+]
+
+
+def batch_platform_stats(manager):
+    """Recompute get_platform_stats() from scratch over manager.posts"""
+    stats = {}
+    for post in manager.posts:
+        entry = stats.setdefault(post.platform, {'total_posts': 0, 'total_engagement': 0,
+                                                 'sentiment_counts': Counter()})
+        entry['total_posts'] += 1
+        entry['total_engagement'] += post.get_engagement_rate()
+        entry['sentiment_counts'][manager.analyzer.analyze_sentiment(post.content)[0]] += 1
+    for entry in stats.values():
+        entry['sentiment_counts'] = dict(entry['sentiment_counts'])
+    return stats
+
+
+def batch_top_posts(manager, n):
+    """Recompute get_top_posts(n) from scratch: by engagement, ties in creation order"""
+    return sorted(manager.posts, key=lambda post: -post.get_engagement_rate())[:n]
+
+
+class SocialMediaManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = SocialMediaManager(quiet=True)
+
+    def assertMatchesBatch(self):
+        self.assertEqual(self.manager.get_platform_stats(), batch_platform_stats(self.manager))
+        for n in (1, 3, 10, len(self.manager.posts) + 1):
+            self.assertEqual(self.manager.get_top_posts(n), batch_top_posts(self.manager, n))
+        self.assertEqual(self.manager.total_engagement,
+                         sum(post.get_engagement_rate() for post in self.manager.posts))
+
+    def test_interleaved_updates_match_batch_recomputation(self):
+        rng = random.Random(7)
+        for step in range(400):
+            op = rng.random()
+            if op < 0.3 or not self.manager.posts:
+                self.manager.create_post(rng.choice(['Twitter', 'LinkedIn', 'Instagram']),
+                                         rng.choice(TEXTS), 'author%d' % rng.randrange(20), ['#AI'])
+            elif op < 0.7:
+                rng.choice(self.manager.posts).add_engagement(likes=rng.randrange(5), shares=rng.randrange(3),
+                                                              comments=rng.randrange(2))
+            elif op < 0.85:
+                post = rng.choice(self.manager.posts)
+                post.content = rng.choice(TEXTS)
+                self.manager.analyze_post(post)
+            else:
+                self.manager.analyze_corpus(rng.sample(self.manager.posts, min(5, len(self.manager.posts))),
+                                            workers=1)
+            if step % 25 == 0:
+                self.assertMatchesBatch()
+        self.assertMatchesBatch()
+
+    def test_content_change_moves_sentiment_on_reanalysis(self):
+        post = self.manager.create_post('Twitter', TEXTS[0], 'a')
+        self.assertEqual(self.manager.get_platform_stats()['Twitter']['sentiment_counts'], {'Positive': 1})
+
+        post.content = TEXTS[1]
+        self.manager.analyze_post(post)
+
+        self.assertEqual(self.manager.get_platform_stats()['Twitter']['sentiment_counts'], {'Negative': 1})
+
+    def test_adding_a_post_twice_is_a_no_op(self):
+        post = SocialMediaPost('Twitter', TEXTS[0], 'a')
+        self.manager.add_post(post)
+        self.manager.add_post(post)
+        post.add_engagement(likes=3)
+
+        self.assertEqual(self.manager.posts, [post])
+        self.assertEqual(self.manager.get_top_posts(5), [post])
+        self.assertMatchesBatch()
+
+    def test_post_tracked_by_another_manager_is_rejected(self):
+        post = self.manager.create_post('Twitter', TEXTS[0], 'a')
+        with self.assertRaises(ValueError):
+            SocialMediaManager(quiet=True).add_post(post)
+
+
+class SocialMediaPostTestCase(unittest.TestCase):
+    def test_to_dict_keeps_the_local_timestamp_format(self):
+        post = SocialMediaPost.from_dict({'platform': 'Twitter', 'content': 'x', 'author': 'a',
+                                          'timestamp': '2024-01-05 10:00:00'})
+
+        self.assertEqual(post.to_dict()['timestamp'], '2024-01-05 10:00:00')
+        self.assertEqual(post.created, int(datetime(2024, 1, 5, 10).timestamp()))
+
+    def test_utc_timestamps_are_opt_in(self):
+        for value in ('2024-01-05 10:00:00', '2024-01-05T10:00:00Z', '2024-01-05T12:00:00+02:00',
+                      '2024-01-05 10:00:00+0000', 1704448800):
+            post = SocialMediaPost.from_dict({'platform': 'Twitter', 'content': 'x', 'author': 'a',
+                                              'timestamp': value}, utc=True)
+            self.assertEqual(post.created, 1704448800, value)
+            self.assertEqual(post.to_dict(utc=True)['timestamp'], '2024-01-05 10:00:00+0000')
+
+    def test_unparseable_timestamp_is_kept_verbatim(self):
+        post = SocialMediaPost.from_dict({'platform': 'Twitter', 'content': 'x', 'author': 'a',
+                                          'timestamp': 'Jan 5 2024'})
+
+        self.assertIsNone(post.created)
+        self.assertEqual(post.to_dict()['timestamp'], 'Jan 5 2024')
+
+    def test_round_trip_preserves_created(self):
+        post = SocialMediaPost('Twitter', 'x', 'a')
+        self.assertEqual(SocialMediaPost.from_dict(post.to_dict()).created, post.created)
+
+    def test_engagement_writes_update_the_post_and_the_aggregates(self):
+        manager = SocialMediaManager(quiet=True)
+        post = manager.create_post('Twitter', 'x', 'a')
+
+        post.engagement['likes'] += 2
+        post.engagement = {'likes': 2, 'shares': 1, 'comments': 0}
+
+        self.assertEqual(post.likes, 2)
+        self.assertEqual(post.to_dict()['engagement'], {'likes': 2, 'shares': 1, 'comments': 0})
+        self.assertEqual(manager.total_engagement, 3)
+        self.assertEqual(manager.get_platform_stats()['Twitter']['total_engagement'], 3)
+
+if __name__ == '__main__':
+    unittest.main()